@@ -1,8 +1,8 @@
 
-from main import convert_gnucash_to_datev
+from main import convert_gnucash_to_datev, convert_gnucash_book_to_datev
 import src.gnucash_file as gnucash
 import src.datev_file as datev
 
 __all__ = [
-    'gnucash', 'datev', 'convert_gnucash_to_datev'
+    'gnucash', 'datev', 'convert_gnucash_to_datev', 'convert_gnucash_book_to_datev'
 ]
@@ -0,0 +1,237 @@
+#!/usr/bin/python3
+
+import contextlib
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+import main
+from src.gnucash_book import CSVExportsBook, open_gnucash_book
+from src.result_cache import ResultCache
+from src.utils import parse_any_date
+
+# Options that can be given per entity, or for all entities in the manifest's "defaults":
+ENTITY_OPTIONS = (
+    'accounts', 'transactions', 'book', 'output_folder', 'title', 'output_file_title', 'financial_year_start',
+    'start_date', 'end_date', 'skr_number', 'incremental', 'unsorted_exports', 'cache_dir', 'check_exports_order',
+)
+
+
+@dataclass
+class BatchEntity:
+    """
+    One conversion of a batch: either a pair of CSV exports (`accounts` and `transactions`) or a
+    GnuCash `book` file, plus the options for converting it. Relative paths in a manifest are
+    relative to the manifest's folder.
+    """
+
+    name: str
+    output_folder: str
+    accounts: str | None = None
+    transactions: str | None = None
+    book: str | None = None
+    title: str | None = None
+    output_file_title: str | None = None
+    financial_year_start: str | None = None
+    start_date: str | None = None
+    end_date: str | None = None
+    skr_number: str | None = None
+    incremental: bool = False
+    unsorted_exports: int | None = None  # memory budget in MiB, see `--unsorted-exports`
+    cache_dir: str | None = None
+    check_exports_order: bool = True
+
+
+@dataclass
+class BatchResult:
+    name: str
+    succeeded: bool
+    seconds: float
+    messages: List[str] = field(default_factory=list)
+    error: str | None = None
+
+
+def load_manifest(path: str) -> List[BatchEntity]:
+    """
+    Load the entities of a batch manifest, which is a JSON or TOML (`.toml`) file like this:
+
+        [defaults]
+        financial_year_start = "2023-01-01"
+
+        [[entities]]
+        name = "Example GmbH"
+        accounts = "example/accounts.csv"
+        transactions = "example/transactions.csv"
+        output_folder = "example/datev"
+        title = "Buchungen Example GmbH"
+    """
+
+    with open(path, 'rb') as f:
+        if path.endswith('.toml'):
+            import tomllib  # Python >= 3.11
+            data = tomllib.load(f)
+        else:
+            data = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    defaults = data.get('defaults', {})
+    entities = []
+
+    for i, options in enumerate(data.get('entities', [])):
+        options = {**defaults, **options}
+        unknown = set(options) - set(ENTITY_OPTIONS) - {'name'}
+
+        if unknown:
+            raise ValueError(f"Unknown option(s) {', '.join(sorted(unknown))} for entity {i+1} in \"{path}\".")
+        if not options.get('book') and not (options.get('accounts') and options.get('transactions')):
+            raise ValueError(f"Entity {i+1} in \"{path}\" needs either a \"book\" or both \"accounts\" and "
+                             f"\"transactions\" exports.")
+        if not options.get('output_folder'):
+            raise ValueError(f"Entity {i+1} in \"{path}\" has no \"output_folder\".")
+
+        for key in ('accounts', 'transactions', 'book', 'output_folder', 'cache_dir'):
+            if options.get(key):
+                options[key] = os.path.normpath(os.path.join(base_dir, os.path.expanduser(options[key])))
+
+        options.setdefault('name', os.path.basename(os.path.normpath(options['output_folder'])))
+        entities.append(BatchEntity(**options))
+
+    return entities
+
+
+def convert_entity(entity: BatchEntity) -> BatchResult:
+    """
+    Convert a single entity. Any error is caught and reported in the result instead of being
+    raised, such that a failing entity doesn't abort the rest of the batch.
+    """
+
+    start = time.perf_counter()
+    messages = []
+
+    try:
+        with contextlib.ExitStack() as stack:
+            if entity.book:
+                book = open_gnucash_book(entity.book)
+                stack.callback(book.close)
+            else:
+                accounts_fd = stack.enter_context(open(entity.accounts))
+                bookings_fd = stack.enter_context(open(entity.transactions))
+                if entity.check_exports_order:
+                    accounts_fd, bookings_fd = main.ensure_correct_exports_order(accounts_fd, bookings_fd,
+                                                                                 print_warning=False)
+                book = CSVExportsBook(accounts_fd, bookings_fd, group_memory_budget=(
+                    entity.unsorted_exports * 1024 * 1024 if entity.unsorted_exports is not None else None))
+
+            os.makedirs(entity.output_folder, exist_ok=True)
+
+            main.convert_gnucash_book_to_datev(
+                book=book,
+                start_date=parse_any_date(entity.start_date),
+                end_date=parse_any_date(entity.end_date),
+                financial_year_start=parse_any_date(entity.financial_year_start),
+                skr_number=entity.skr_number or main.dt.DEFAULT_SKR_NUMBER,
+                title=entity.title,
+                datev_output_dir=entity.output_folder,
+                datev_output_file_title=entity.output_file_title,
+                print_message_function=messages.append,
+                incremental=entity.incremental,
+                cache=ResultCache(entity.cache_dir) if entity.cache_dir else None,
+            )
+    except Exception:
+        return BatchResult(entity.name, False, time.perf_counter() - start, messages, traceback.format_exc())
+
+    return BatchResult(entity.name, True, time.perf_counter() - start, messages)
+
+
+def run_batch(entities: List[BatchEntity],
+              workers: int = 1,
+              print_message_function: Callable[[str], None] = lambda _: None) -> List[BatchResult]:
+    """
+    Convert all given entities on a pool of `workers` processes. Results are returned in the
+    order of `entities`; the last line of each entity's log is printed as soon as it finished.
+
+    If a worker process dies (e.g. because it ran out of memory), the pool cannot be used any
+    longer, and it is not known which entity caused this. The unfinished entities are then
+    converted one at a time, each in a process of its own, so only the culprit fails.
+    """
+
+    results: Dict[int, BatchResult] = {}
+
+    def report(i: int, result: BatchResult):
+        results[i] = result
+        status = result.messages[-1] if result.succeeded and result.messages else \
+            'succeeded' if result.succeeded else f"FAILED: {result.error.strip().splitlines()[-1]}"
+        print_message_function(f"[{len(results)}/{len(entities)}] {result.name} ({result.seconds:.1f}s): {status}")
+
+    if workers > 1 and len(entities) > 1:
+        unfinished = []
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(convert_entity, entity): i for i, entity in enumerate(entities)}
+            for future in as_completed(futures):
+                try:
+                    report(futures[future], future.result())
+                except BrokenProcessPool:
+                    unfinished.append(futures[future])
+
+        if unfinished:
+            print_message_function(f"A worker process terminated abruptly, converting the remaining {len(unfinished)} "
+                                   f"{'entity' if len(unfinished) == 1 else 'entities'} one at a time…")
+            for i in sorted(unfinished):
+                report(i, _convert_entity_in_own_process(entities[i]))
+    else:
+        for i, entity in enumerate(entities):
+            report(i, convert_entity(entity))
+
+    return [results[i] for i in range(len(entities))]
+
+
+def _convert_entity_in_own_process(entity: BatchEntity) -> BatchResult:
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        try:
+            return executor.submit(convert_entity, entity).result()
+        except BrokenProcessPool:
+            return BatchResult(entity.name, False, time.perf_counter() - start,
+                               error="The process converting this entity terminated abruptly, e.g. because it "
+                                     "ran out of memory.")
+
+
+def format_summary(results: List[BatchResult]) -> str:
+    failed = [result for result in results if not result.succeeded]
+    lines = [f"{len(results) - len(failed)} of {len(results)} {'entity' if len(results) == 1 else 'entities'} "
+             f"converted successfully, {len(failed)} failed."]
+
+    for result in failed:
+        lines.append("")
+        lines.append(f"{result.name}:")
+        lines.extend(f"    {line}" for line in result.error.rstrip().splitlines())
+
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert the GnuCash books of many entities, as listed in a "
+                                                 "JSON or TOML manifest (see `load_manifest` for its format).")
+
+    parser.add_argument("manifest", help="The path to the manifest file (.json or .toml)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Number of entities to convert in parallel. Default: number of CPUs")
+
+    args = parser.parse_args(sys.argv[1:])
+
+    results = run_batch(load_manifest(args.manifest), workers=args.jobs, print_message_function=print)
+
+    print()
+    print(format_summary(results))
+
+    sys.exit(0 if all(result.succeeded for result in results) else 1)
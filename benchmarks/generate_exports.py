@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+
+"""
+Generates synthetic GnuCash "Account Tree" and "Transactions" CSV exports of a configurable
+size, using the same column layout as GnuCash. Used by the benchmarks.
+"""
+
+import csv
+import datetime
+import os.path
+import random
+import sys
+from decimal import Decimal
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src.gnucash_file as gc
+
+DESCRIPTIONS = [
+    'Office supplies', 'Train ticket "ICE 597"', 'Customer payment; invoice 2023-117', 'Rent', 'Insurance',
+    'Hosting and domains for the company website, billed annually as per contract no. 4711-0815',
+]
+
+
+def generate_accounts(count: int) -> List[Tuple[str, str, str]]:
+    """
+    Returns `count` accounts as tuples of (type, full account name, account code). The first
+    account is always a bank account.
+    """
+
+    accounts = [('BANK', 'Assets:Current Assets:Bank', '1800')]
+    types = [('EXPENSE', 'Expenses', 4000), ('INCOME', 'Income', 8000), ('ASSET', 'Assets:Receivables', 1200)]
+
+    for i in range(1, count):
+        type_, parent, code_base = types[i % len(types)]
+        accounts.append((type_, f'{parent}:Account {i}', str(code_base + i // len(types))))
+
+    return accounts
+
+
+def write_accounts_export(path: str, accounts: List[Tuple[str, str, str]]):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        writer.writerow(gc.AccountsCSVFile().header)
+
+        for type_, full_name, code in accounts:
+            writer.writerow([type_, full_name, full_name.rsplit(':', 1)[-1], code, '', '', '', 'EUR', 'CURRENCY',
+                             'F', 'F', 'F'])
+
+
+def write_transactions_export(path: str, accounts: List[Tuple[str, str, str]], transactions: int,
+                              start_date: datetime.date, years: int, max_splits: int = 3, seed: int = 0,
+                              date_format: str = '%m/%d/%Y') -> int:
+    """
+    Writes `transactions` transactions, evenly spread over `years` years, each consisting of one
+    bank split and 1 to `max_splits` contra splits. Returns the number of splits written.
+    """
+
+    rng = random.Random(seed)
+    days = (datetime.date(start_date.year + years, start_date.month, start_date.day) - start_date).days
+    splits_written = 0
+
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        writer.writerow(gc.BookingsCSVFile().header)
+
+        for i in range(transactions):
+            date = (start_date + datetime.timedelta(days=i * days // transactions)).strftime(date_format)
+            transaction_id = '%032x' % rng.getrandbits(128)
+            description = rng.choice(DESCRIPTIONS)
+            amounts = [Decimal(rng.randint(1, 10_000_00)) / 100 for _ in range(rng.randint(1, max_splits))]
+            sign = rng.choice((1, -1))
+
+            splits = [(accounts[0][1], -sign * sum(amounts))]
+            splits += [(rng.choice(accounts[1:])[1], sign * amount) for amount in amounts]
+
+            for full_name, amount in splits:
+                amount_str = f'{amount:,.2f}'
+                writer.writerow([date, transaction_id, '', description, '', 'CURRENCY::EUR', '', '', '', full_name,
+                                 full_name.rsplit(':', 1)[-1], f'€{amount_str}', amount_str, f'€{amount_str}',
+                                 amount_str, 'n', '', '1,00'])
+
+            splits_written += len(splits)
+
+    return splits_written
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+
+    parser.add_argument("output-folder", help="Path to the folder to place the generated exports in")
+    parser.add_argument("--accounts", type=int, default=200, help="Number of accounts. Default: 200")
+    parser.add_argument("--transactions", type=int, default=100_000, help="Number of transactions. Default: 100000")
+    parser.add_argument("--years", type=int, default=3, help="Number of years to spread the transactions over. Default: 3")
+    parser.add_argument("--max-splits", type=int, default=3, help="Maximum number of contra splits per transaction. Default: 3")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the random number generator. Default: 0")
+
+    args = parser.parse_args(sys.argv[1:])
+    output_folder = getattr(args, 'output-folder')
+
+    accounts = generate_accounts(args.accounts)
+    write_accounts_export(os.path.join(output_folder, 'accounts.csv'), accounts)
+    splits = write_transactions_export(os.path.join(output_folder, 'transactions.csv'), accounts, args.transactions,
+                                       datetime.date(2020, 1, 1), args.years, args.max_splits, args.seed)
+
+    print(f"Wrote {len(accounts)} accounts and {args.transactions} transactions ({splits} splits) to \"{output_folder}\"")
@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+
+"""
+Times the individual stages of a GnuCash to DATEV conversion on synthetic exports and reports
+throughput and peak memory as JSON. Per-stage peak memory is only traced with --trace-memory,
+since tracing slows down the stages considerably.
+"""
+
+import datetime
+import io
+import json
+import os.path
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+from typing import Callable, Dict, Any, TypeVar
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+import src.datev_file as dt
+import src.gnucash_file as gc
+from src.utils import Periods, yearly_split
+
+from generate_exports import generate_accounts, write_accounts_export, write_transactions_export
+
+T = TypeVar('T')
+
+
+def measure(stage: str, rows: int, results: Dict[str, Any], fn: Callable[[], T], trace_memory: bool = False) -> T:
+    """
+    Run `fn`, recording its duration and its throughput in rows per second into `results[stage]`.
+    If `trace_memory` is True, the peak memory allocated while `fn` ran is recorded as well.
+    """
+
+    if trace_memory:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    try:
+        value = fn()
+    finally:
+        duration = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+
+    results[stage] = {
+        'seconds': round(duration, 6),
+        'rows': rows,
+        'rows_per_second': round(rows / duration, 1) if duration else None,
+        'peak_memory_bytes': peak,
+    }
+    return value
+
+
+def run_benchmarks(data_folder: str, accounts: int, transactions: int, years: int,
+                   trace_memory: bool = False) -> Dict[str, Any]:
+    accounts_path = os.path.join(data_folder, 'accounts.csv')
+    transactions_path = os.path.join(data_folder, 'transactions.csv')
+
+    account_list = generate_accounts(accounts)
+    write_accounts_export(accounts_path, account_list)
+    splits = write_transactions_export(transactions_path, account_list, transactions, datetime.date(2020, 1, 1), years)
+
+    stages = {}
+
+    with open(accounts_path) as f:
+        accounts_file = measure('load_accounts', accounts, stages, lambda: gc.AccountsCSVFile.load_csv_export(f),
+                                trace_memory)
+
+    with open(transactions_path) as f:
+        bookings_file = measure('load_bookings', splits, stages, lambda: gc.BookingsCSVFile.load_csv_export(f),
+                                trace_memory)
+
+    with open(transactions_path) as f:
+        grouped_transactions = list(gc.BookingsCSVFile.iter_csv_export(f))
+
+    start_date = min(transaction[0].date for transaction in grouped_transactions)
+    end_date = max(transaction[0].date for transaction in grouped_transactions)
+    periods = Periods(yearly_split(end_date, start_date))
+    datev_files = [
+        dt.BookingsCSVFile(start_date=start, end_date=end, financial_year_start=datetime.date(start.year, 1, 1),
+                           title='Benchmark')
+        for start, end in periods
+    ]
+
+    def convert():
+        for transaction in grouped_transactions:
+            main.add_transaction_to_datev_file(datev_files[periods.index_of(transaction[0].date)], transaction,
+                                               accounts_file)
+
+    measure('convert_transactions', splits, stages, convert, trace_memory)
+
+    datev_rows = sum(len(f.rows) for f in datev_files)
+    outputs = measure('to_csv', datev_rows, stages,
+                      lambda: [f.to_csv(io.BytesIO(), encoding='utf-8') for f in datev_files], trace_memory)
+    stages['to_csv']['bytes'] = sum(len(output) for output in outputs)
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'accounts': accounts,
+        'transactions': transactions,
+        'splits': len(bookings_file.rows),
+        'datev_rows': datev_rows,
+        'stages': stages,
+        # Peak resident set size of the whole benchmark process (Linux reports KiB, macOS bytes):
+        'max_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+
+    parser.add_argument("--accounts", type=int, default=200, help="Number of accounts. Default: 200")
+    parser.add_argument("--transactions", type=int, default=100_000, help="Number of transactions. Default: 100000")
+    parser.add_argument("--years", type=int, default=3, help="Number of years to spread the transactions over. Default: 3")
+    parser.add_argument("--trace-memory", action='store_true',
+                        help="Trace the peak memory of each stage. This slows down the stages considerably.")
+    parser.add_argument("--output", default=None, help="Path to write the JSON results to. Default: stdout")
+
+    args = parser.parse_args(sys.argv[1:])
+
+    with tempfile.TemporaryDirectory() as data_folder:
+        results = run_benchmarks(data_folder, args.accounts, args.transactions, args.years, args.trace_memory)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
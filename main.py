@@ -1,16 +1,43 @@
 #!/usr/bin/python3
 
+import contextlib
 import csv
 import datetime
+import locale
 import logging
 import os.path
+import stat
 import sys
-from itertools import groupby
-from typing import Iterable, List, Callable, TextIO
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from typing import Dict, Iterable, Iterator, List, Callable, TextIO, Tuple
 
 import src.datev_file as dt
 import src.gnucash_file as gc
-from src.utils import yearly_split, truncate_string, parse_any_date
+from src.conversion_state import ConversionState, fingerprint
+from src.export_watcher import ExportWatcher, Signature
+from src.gnucash_book import GnuCashBook, CSVExportsBook, open_gnucash_book
+from src.instrumentation import Instrumentation, Stage, TimedWriter
+from src.result_cache import ResultCache
+from src.split_decomposition import decompose_splits
+from src.utils import Periods, yearly_split, truncate_string, parse_any_date
+
+
+@dataclass
+class DatevFileSummary:
+    """
+    A DATEV file written in streaming mode (see `convert_gnucash_book_to_datev`), in place of its contents.
+    """
+
+    filename: str
+    start_date: datetime.date
+    end_date: datetime.date
+    bookings: int  # number of DATEV bookings (rows)
+    transactions: int  # number of GnuCash transactions these were converted from
+    size: int  # in bytes
 
 
 def convert_gnucash_to_datev(gnucash_accounts_export_fd: Iterable[str],
@@ -22,17 +49,131 @@ def convert_gnucash_to_datev(gnucash_accounts_export_fd: Iterable[str],
                              title: str | None = None,
                              datev_output_dir: str = os.path.realpath('.'),
                              datev_output_file_title: str | None = None,
-                             print_message_function: Callable[[str], None] = lambda _: None):
-    accounts_file = gc.AccountsCSVFile.load_csv_export(gnucash_accounts_export_fd)
-    bookings_file = gc.BookingsCSVFile.load_csv_export(gnucash_bookings_export_fd)
+                             print_message_function: Callable[[str], None] = lambda _: None,
+                             workers: int = 1,
+                             instrumentation: Instrumentation | None = None,
+                             incremental: bool = False,
+                             cache: ResultCache | None = None,
+                             streaming: bool = False,
+                             zip_output: str | None = None,
+                             group_memory_budget: int | None = None) -> List[dt.BookingsCSVFile] | List[DatevFileSummary]:
+    """
+    Convert GnuCash account tree and transactions CSV exports into DATEV bookings files, one
+    per (calendar) year, which are placed into `datev_output_dir`. See `convert_gnucash_book_to_datev`
+    for the remaining parameters.
 
-    start_date = start_date or min(d.date for d in bookings_file.rows)
-    end_date = end_date or max(d.date for d in bookings_file.rows)
+    :param group_memory_budget: If given, the splits of a transaction don't need to be adjacent
+        in the transactions export (e.g. for re-sorted or concatenated exports). They are grouped
+        using about this many bytes of memory, and temporary files beyond that.
+    """
+    book = CSVExportsBook(gnucash_accounts_export_fd, gnucash_bookings_export_fd, group_memory_budget)
+    return convert_gnucash_book_to_datev(
+        book,
+        start_date=start_date,
+        end_date=end_date,
+        financial_year_start=financial_year_start,
+        skr_number=skr_number,
+        title=title,
+        datev_output_dir=datev_output_dir,
+        datev_output_file_title=datev_output_file_title,
+        print_message_function=print_message_function,
+        workers=workers,
+        instrumentation=instrumentation,
+        incremental=incremental,
+        cache=cache,
+        streaming=streaming,
+        zip_output=zip_output,
+    )
+
+
+def convert_gnucash_book_to_datev(book: GnuCashBook,
+                                  start_date: datetime.date | None = None,
+                                  end_date: datetime.date | None = None,
+                                  financial_year_start: datetime.date | None = None,
+                                  skr_number: str = dt.DEFAULT_SKR_NUMBER,
+                                  title: str | None = None,
+                                  datev_output_dir: str = os.path.realpath('.'),
+                                  datev_output_file_title: str | None = None,
+                                  print_message_function: Callable[[str], None] = lambda _: None,
+                                  workers: int = 1,
+                                  instrumentation: Instrumentation | None = None,
+                                  incremental: bool = False,
+                                  cache: ResultCache | None = None,
+                                  streaming: bool = False,
+                                  zip_output: str | None = None) -> List[dt.BookingsCSVFile] | List[DatevFileSummary]:
+    """
+    Convert a GnuCash book (e.g. its CSV exports or an XML or SQLite book file, see `src.gnucash_book`)
+    into DATEV bookings files, one per (calendar) year, which are placed into `datev_output_dir`.
+
+    :param workers: If greater than 1, the DATEV files of the individual periods are built
+        and written on a pool of this many processes. The bookings are then collected per
+        period first, instead of being streamed into the DATEV files.
+    :param instrumentation: If given, timings and row/byte counts of the individual conversion
+        stages (loading, bucketing, converting, serializing and writing) are reported to it.
+    :param incremental: If True, a fingerprint of each period's bookings and conversion options
+        is stored in a state file in `datev_output_dir`, and periods that did not change since
+        the last run are skipped. Only the regenerated DATEV files are returned then.
+    :param cache: If given, the generated DATEV files are stored in this cache, and restored
+        from it if the book and the conversion parameters match a previous conversion. In
+        that case, nothing is converted and an empty list is returned (with `incremental`, the
+        state file is updated for the restored files first).
+    :param streaming: If True, the transactions are walked once and each converted booking is
+        written to its period's DATEV file right away, keeping one open output file per period
+        that has bookings, instead of holding all bookings in memory until the files are
+        written. Files are completed once all transactions were read (the transactions of a
+        book are not necessarily ordered by date), and `DatevFileSummary`s are returned in place
+        of the DATEV files. Can't be combined with `workers`.
+    :param zip_output: If given, all DATEV files are written into a single (deflate compressed)
+        ZIP file at this path instead of into `datev_output_dir`, without any intermediate
+        files. Can't be combined with `incremental` or `streaming`.
+    """
 
-    periods = list(yearly_split(end_date, start_date))
-    datev_files = []
+    if streaming and workers > 1:
+        raise ValueError("Streaming can't be combined with converting periods in parallel (`workers`).")
+    if zip_output and (incremental or streaming):
+        raise ValueError("ZIP output can't be combined with incremental or streaming conversions.")
+
+    instrumentation = instrumentation or Instrumentation()
+
+    restored_files = None
+
+    if cache:
+        group_memory_budget = book.group_memory_budget if isinstance(book, CSVExportsBook) else None
+
+        with instrumentation.measure('cache_lookup'):
+            cache_key = cache.key(book.fingerprint(), start_date, end_date, financial_year_start, skr_number, title,
+                                  datev_output_file_title, os.path.basename(zip_output) if zip_output else None,
+                                  group_memory_budget)
+            restored_files = cache.restore(cache_key, (os.path.dirname(zip_output) or '.') if zip_output else datev_output_dir)
+
+        if restored_files is not None:
+            for fn in restored_files:
+                print_message_function(f" - Restored output file \"{fn}\" from the cache")
+            if zip_output:
+                print_message_function("ZIP file of DATEV-compatible files restored from the cache.")
+            else:
+                print_message_function(f"{len(restored_files)} DATEV-compatible {'file' if len(restored_files) == 1 else 'files'} restored from the cache.")
+            if not incremental:  # otherwise, the restored files are recorded in the state below
+                return []
+
+    with instrumentation.measure('load_accounts') as stage:
+        accounts_file = book.load_accounts()
+        stage.rows = len(accounts_file.rows)
+
+    if not start_date or not end_date:
+        with instrumentation.measure('scan_dates'):
+            first_date, last_date = book.date_range()
+        start_date = start_date or first_date
+        end_date = end_date or last_date
+
+    periods = Periods(yearly_split(end_date, start_date))
 
-    print_message_function(f"Converting transactions from {start_date} to {end_date} ({len(periods)} {'period' if len(periods) == 1 else 'periods'})…")
+    if restored_files is None:
+        print_message_function(f"Converting transactions from {start_date} to {end_date} ({len(periods)} {'period' if len(periods) == 1 else 'periods'})…")
+
+    datev_files = []
+    filenames = []
+    fingerprints = []
 
     for current_period, (start, end) in enumerate(periods):  # DATEV requires one CSV file per year
         if financial_year_start and current_period == 0:  # for the first period, we respect `financial_year_start`, if it is given
@@ -45,91 +186,401 @@ def convert_gnucash_to_datev(gnucash_accounts_export_fd: Iterable[str],
             end_date=end,
             financial_year_start=current_fin_year_start,
             skr_number=skr_number,
-            title=title or f'Buchungen {start_date.strftime("%Y-%m")} bis {end_date.strftime("%Y-%m")}',
+            # By default, each file is titled with its own period, such that it doesn't change when bookings
+            # are added to other periods (which would make incremental conversions regenerate it):
+            title=title or f'Buchungen {start.strftime("%Y-%m")} bis {end.strftime("%Y-%m")}',
         )
-
-        filtered_bookings = tuple(filter(  # query all bookings in the current period's year
-            lambda b: b.date.year == start.year,
-            bookings_file.rows
-        ))
-
-        for transaction_id, splits in groupby(filtered_bookings, key=lambda b: b.transaction_id):
-            splits: List[gc.Booking] = list(splits)
-
-            debit_splits = [b for b in splits if b.amount_num < 0]
-            credit_splits = [b for b in splits if b.amount_num > 0]
-
-            if len(debit_splits) > 1 and len(credit_splits) > 1:
-                logging.error(f"Transaction: {debit_splits[0].description}")
-                logging.error(f"  - Debit splits:")
-                for b in debit_splits:
-                    logging.error(f"    - {b.amount_with_sym} in {accounts_file.get_account_by_full_name(b.full_account_name).account_code} \"{b.full_account_name}\"")
-                logging.error(f"  - Credit splits:")
-                for b in credit_splits:
-                    logging.error(f"    - {b.amount_with_sym} in {accounts_file.get_account_by_full_name(b.full_account_name).account_code} \"{b.full_account_name}\"")
-                raise RuntimeError("There is more than one split for both, debit and credit. Thus there's an\n"
-                                   "ambiguity in how to convert these splits into multiple bookings (which has\n"
-                                   "to be done because DATEV doesn't support split transactions). This ambiguity\n"
-                                   "can (at least to my knowledge) not easily be resolved. Consider creating\n"
-                                   "separate split transactions in GnuCash, such that there's either exactly\n"
-                                   "one debit split or exactly one credit split.\n"
-                                   "See above for details about the transaction.")
-
-            if len(debit_splits) > 1:
-                bookings, contra_booking = debit_splits, credit_splits[0],
-            else:
-                bookings, contra_booking = credit_splits, debit_splits[0]
-
-            contra_account = accounts_file.get_account_by_full_name(contra_booking.full_account_name)
-
-            if not contra_account:
-                raise ValueError(f"Account \"{contra_booking.full_account_name}\" from booking \"{contra_booking.description}\" "
-                                 f"cannot be found in the exported account file. This potentially indicates that the"
-                                 f"supplied booking CSV export doesn't match the supplied accounts CSV export.")
-
-            for booking in bookings:
-                account = accounts_file.get_account_by_full_name(booking.full_account_name)
-
-                if not account:
-                    raise ValueError(f"Account \"{booking.full_account_name}\" from booking \"{booking.description}\" "
-                                     f"cannot be found in the exported account file. This potentially indicates that "
-                                     f"the supplied booking CSV export doesn't match the supplied accounts CSV export.")
-
-                datev_file.add_booking(
-                    revenue=abs(booking.amount_num),
-                    document_date=booking.date,
-                    posting_text=truncate_string(booking.description, 60),
-                    account=int(account.account_code),
-                    contra_account_without_bu_key=int(contra_account.account_code),
-                    debit_credit_indicator='S' if booking.amount_num > 0 else 'H',  # S = debit, H = credit
-                    additional_info_type_1="OriginalGnuCashTransactionId",
-                    additional_info_content_1=transaction_id,
-                    additional_info_type_2='OriginalTransactionDescription' if len(booking.description) > 60 else None,
-                    additional_info_content_2=truncate_string(booking.description, 210) if len(booking.description) > 60 else None,
-                )
+        datev_files.append(datev_file)
 
         file_title = datev_output_file_title or title
         if file_title and len(periods) > 1:
             file_title += f"_{start.year}"
-        fn = os.path.join(
+        filenames.append(os.path.join(
             datev_output_dir,
             datev_file.get_suggested_filename(title=file_title)
-        )
+        ))
 
-        with open(fn, "w+") as f:
-            datev_file.to_csv(f)
+    # Determine which periods need to be (re)generated:
+    dirty_periods = [True] * len(periods)
+
+    if incremental:
+        state = ConversionState.load(datev_output_dir)
+
+        with instrumentation.measure('fingerprint'):
+            bookings_fingerprints = book.fingerprint_periods(periods)
+            accounts_fingerprint = fingerprint(*((a.full_account_name, a.account_code) for a in accounts_file.rows))
+
+        for current_period, datev_file in enumerate(datev_files):
+            fingerprints.append(fingerprint(
+                bookings_fingerprints[current_period], accounts_fingerprint, periods[current_period],
+                datev_file.header[:5], datev_file.header[6:],  # all header fields except the creation timestamp
+                filenames[current_period],
+            ))
+            dirty_periods[current_period] = not state.is_current(filenames[current_period], fingerprints[-1])
+
+        if restored_files is not None:  # all files were restored from the cache
+            for fn, period_fingerprint in zip(filenames, fingerprints):
+                state.update(fn, period_fingerprint)
+            state.save()
+            return []
+
+        if not any(dirty_periods):  # nothing changed, so the transactions don't even need to be read
+            for current_period, fn in enumerate(filenames):
+                _print_period_skipped(print_message_function, periods, current_period, fn)
+            print_message_function("All DATEV-compatible files are up to date.")
+            return []
+
+    # Only read the transactions of the periods to (re)generate, if the book supports that (see `iter_transactions`):
+    dirty_range = [period for period, dirty in zip(periods, dirty_periods) if dirty]
+
+    load_stage = Stage('load_bookings')  # counts transactions
+    bucket_stage = Stage('bucket_periods')
+    transactions = instrumentation.timed(load_stage, book.iter_transactions(dirty_range[0][0], dirty_range[-1][1]))
+
+    with _zip_output(zip_output) as zip_file:  # None, unless writing a ZIP file
+        if workers > 1:
+            # Collect the transactions per period, then build and write each period's file in parallel:
+            with bucket_stage:
+                buckets = periods.partition(transactions, key=lambda splits: splits[0].date, sort=False)
+            bucket_stage.seconds -= load_stage.seconds  # the transactions were loaded while bucketing them
+            bucket_stage.rows = sum(len(bucket) for bucket in buckets)
+            instrumentation.report(load_stage)
+            instrumentation.report(bucket_stage)
+
+            dirty = [i for i in range(len(periods)) if dirty_periods[i]]
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = iter(executor.map(_convert_period, dirty, [datev_files[i] for i in dirty],
+                                            [buckets[i] for i in dirty], [None if zip_file else filenames[i] for i in dirty],
+                                            repeat(accounts_file)))
+
+                for current_period in range(len(periods)):  # results are yielded in period order
+                    if not dirty_periods[current_period]:
+                        _print_period_skipped(print_message_function, periods, current_period, filenames[current_period])
+                        continue
+
+                    datev_files[current_period], stages = next(results)
+                    for stage in stages:
+                        instrumentation.report(stage)
+                    if zip_file:  # the worker only converted the period's bookings
+                        _write_datev_file(datev_files[current_period], filenames[current_period], current_period,
+                                          instrumentation, zip_file)
+                    _print_period_written(print_message_function, periods, current_period, stages[0].rows,
+                                          _output_path(filenames[current_period], zip_output))
+        elif streaming:
+            datev_files = _stream_datev_files(transactions, accounts_file, periods, datev_files, filenames,
+                                              dirty_periods, bucket_stage, print_message_function, instrumentation)
+            bucket_stage.rows = load_stage.rows
+            instrumentation.report(load_stage)
+            instrumentation.report(bucket_stage)
+        else:
+            convert_stages = [Stage('convert', period=i) for i in range(len(periods))]  # count transactions
 
-        datev_files.append(datev_file)
+            # Stream the transactions once, adding each transaction to its period's DATEV file:
+            for splits in transactions:
+                with bucket_stage:
+                    current_period = periods.index_of(splits[0].date)
+
+                if current_period is None or not dirty_periods[current_period]:  # outside of `start_date` and `end_date`, or unchanged
+                    continue
+
+                with convert_stages[current_period]:
+                    add_transaction_to_datev_file(datev_files[current_period], splits, accounts_file)
+                convert_stages[current_period].rows += 1
+
+            bucket_stage.rows = load_stage.rows
+            instrumentation.report(load_stage)
+            instrumentation.report(bucket_stage)
+
+            for current_period, (datev_file, fn) in enumerate(zip(datev_files, filenames)):
+                if not dirty_periods[current_period]:
+                    _print_period_skipped(print_message_function, periods, current_period, fn)
+                    continue
+
+                instrumentation.report(convert_stages[current_period])
+                _write_datev_file(datev_file, fn, current_period, instrumentation, zip_file)
+                _print_period_written(print_message_function, periods, current_period, convert_stages[current_period].rows,
+                                      _output_path(fn, zip_output))
+
+    if incremental:
+        for current_period in range(len(periods)):
+            if dirty_periods[current_period]:
+                state.update(filenames[current_period], fingerprints[current_period])
+        state.save()
+
+        if not streaming:  # only the written files are summarized anyway
+            datev_files = [f for f, dirty in zip(datev_files, dirty_periods) if dirty]
 
-        print_message_function(
-            f" - Wrote output file {current_period+1}/{len(periods)} ({start} to {end}) "
-            f"containing {len(set(b.transaction_id for b in filtered_bookings))} bookings to \"{fn}\"")
+    if cache:
+        with instrumentation.measure('cache_store'):
+            cache.store(cache_key, [zip_output] if zip_output else filenames)
 
-    print_message_function(f"{len(datev_files)} DATEV-compatible {'file' if len(datev_files) == 1 else 'files'} successfully created.")
+    print_message_function(f"{len(datev_files)} DATEV-compatible {'file' if len(datev_files) == 1 else 'files'} successfully created"
+                           + (f" in \"{zip_output}\"." if zip_output else "."))
 
     return datev_files
 
 
+def watch_gnucash_exports(input_dir: str,
+                          datev_output_dir: str = os.path.realpath('.'),
+                          print_message_function: Callable[[str], None] = lambda _: None,
+                          debounce: float = 2.0,
+                          group_memory_budget: int | None = None,
+                          **kwargs):
+    """
+    Watch `input_dir` for GnuCash account tree and transactions CSV exports, and convert each
+    pair of exports whenever one of them changed, until interrupted. Exports are paired by their
+    file names (see `ExportWatcher`); each pair's DATEV files are placed into a subfolder of
+    `datev_output_dir` named after it.
+
+    Conversions are incremental (unless `incremental=False` is passed), so only periods whose
+    bookings changed are regenerated, and parsed account trees are kept in memory until their
+    export changes. `group_memory_budget` is used for all transactions exports (see
+    `CSVExportsBook`), remaining keyword arguments are passed to `convert_gnucash_book_to_datev`.
+    """
+
+    kwargs.setdefault('incremental', True)
+
+    watcher = ExportWatcher(input_dir, debounce=debounce)
+    accounts_files: Dict[str, Tuple[Signature, gc.AccountsCSVFile]] = {}  # by export path
+
+    print_message_function(f"Watching \"{input_dir}\" for GnuCash exports…")
+
+    while True:
+        for pair in watcher.wait():
+            accounts_signature, bookings_signature = signature = watcher.signature(pair)
+            output_dir = os.path.join(datev_output_dir, pair.key) if pair.key else datev_output_dir
+
+            cached = accounts_files.get(pair.accounts_path)
+            accounts_file = cached[1] if cached and cached[0] == accounts_signature else None
+
+            print_message_function(f"Converting \"{os.path.basename(pair.accounts_path)}\" and "
+                                   f"\"{os.path.basename(pair.transactions_path)}\" into \"{output_dir}\"…")
+
+            try:
+                with open(pair.accounts_path) as accounts_fd, open(pair.transactions_path) as bookings_fd:
+                    book = CSVExportsBook(accounts_fd, bookings_fd, group_memory_budget, accounts_file)
+                    os.makedirs(output_dir, exist_ok=True)
+                    convert_gnucash_book_to_datev(book, datev_output_dir=output_dir,
+                                                  print_message_function=print_message_function, **kwargs)
+                    accounts_files[pair.accounts_path] = (accounts_signature, book.load_accounts())
+            except Exception as e:  # keep watching; the pair is retried once its exports change
+                logging.exception(e)
+                print_message_function(f"Converting \"{os.path.basename(pair.transactions_path)}\" failed: {e}")
+
+            watcher.mark_converted(pair, signature)
+
+
+def _convert_period(current_period: int,
+                    datev_file: dt.BookingsCSVFile,
+                    transactions: List[List[gc.Booking]],
+                    fn: str | None,
+                    accounts_file: gc.AccountsCSVFile) -> Tuple[dt.BookingsCSVFile, List[Stage]]:
+    # Runs in a worker process when converting with `workers` > 1
+    instrumentation = Instrumentation()
+
+    with instrumentation.measure('convert', period=current_period) as stage:
+        for splits in transactions:
+            add_transaction_to_datev_file(datev_file, splits, accounts_file)
+        stage.rows = len(transactions)
+
+    if fn:  # otherwise, the file is written by the main process
+        _write_datev_file(datev_file, fn, current_period, instrumentation)
+
+    return datev_file, instrumentation.stages
+
+
+def _write_datev_file(datev_file: dt.BookingsCSVFile, fn: str, current_period: int, instrumentation: Instrumentation,
+                      zip_file: zipfile.ZipFile | None = None):
+    serialize_stage = Stage('serialize', period=current_period)
+    write_stage = Stage('write', period=current_period)  # counts uncompressed bytes
+
+    if zip_file:
+        # Compress the file into the ZIP file as it is serialized, without an intermediate file:
+        # (entries are dated now, like written files, and may exceed 2 GiB, which needs ZIP64 up front)
+        info = zipfile.ZipInfo(os.path.basename(fn), date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = (stat.S_IFREG | 0o644) << 16  # a regular file, rw-r--r--
+        with zip_file.open(info, "w", force_zip64=True) as f:
+            with serialize_stage:
+                datev_file.to_csv(TimedWriter(f, write_stage), encoding=locale.getpreferredencoding(False))
+    else:
+        # Write to a temporary file first and replace the target afterwards, such that existing files
+        # (which might be hard-linked into a `ResultCache`) are never modified in place:
+        try:
+            with open(fn + ".tmp", "wb") as f:
+                with serialize_stage:
+                    datev_file.to_csv(TimedWriter(f, write_stage), encoding=locale.getpreferredencoding(False))
+        except BaseException:
+            if os.path.exists(fn + ".tmp"):
+                os.remove(fn + ".tmp")
+            raise
+        os.replace(fn + ".tmp", fn)
+
+    serialize_stage.seconds -= write_stage.seconds  # the file was written while serializing
+    serialize_stage.rows = len(datev_file.rows)
+    instrumentation.report(serialize_stage)
+    instrumentation.report(write_stage)
+
+
+@contextlib.contextmanager
+def _zip_output(zip_output: str | None) -> Iterator[zipfile.ZipFile | None]:
+    # Like the DATEV files, the ZIP file is written to a temporary file first and only replaces
+    # the target once it is complete
+    if not zip_output:
+        yield None
+        return
+
+    try:
+        with zipfile.ZipFile(zip_output + ".tmp", "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+            yield zip_file
+    except BaseException:
+        if os.path.exists(zip_output + ".tmp"):
+            os.remove(zip_output + ".tmp")
+        raise
+
+    os.replace(zip_output + ".tmp", zip_output)
+
+
+def _output_path(fn: str, zip_output: str | None) -> str:
+    # The path of a DATEV file as shown to the user, which is inside the ZIP file, if any
+    return os.path.join(zip_output, os.path.basename(fn)) if zip_output else fn
+
+
+def _stream_datev_files(transactions: Iterable[List[gc.Booking]], accounts_file: gc.AccountsCSVFile,
+                        periods: Periods, datev_files: List[dt.BookingsCSVFile], filenames: List[str],
+                        dirty_periods: List[bool], bucket_stage: Stage,
+                        print_message_function: Callable[[str], None],
+                        instrumentation: Instrumentation) -> List[DatevFileSummary]:
+    # Streaming mode of `convert_gnucash_book_to_datev`: each period's file is opened on its first
+    # transaction, and written to as bookings are added. Like `_write_datev_file`, files are
+    # written to a temporary file first, which replaces the target once it is complete.
+    encoding = locale.getpreferredencoding(False)
+    convert_stages = [Stage('convert', period=i) for i in range(len(periods))]  # count transactions
+    write_stages = [Stage('write', period=i) for i in range(len(periods))]
+    outputs = {}  # open temporary files by period
+    latest_period = None
+
+    def open_output(current_period: int):
+        outputs[current_period] = f = open(filenames[current_period] + ".tmp", "wb")
+        datev_files[current_period].stream_to(TimedWriter(f, write_stages[current_period]), encoding=encoding)
+
+    try:
+        for splits in transactions:
+            with bucket_stage:
+                current_period = periods.index_of(splits[0].date)
+
+            if current_period is None or not dirty_periods[current_period]:  # outside of `start_date` and `end_date`, or unchanged
+                continue
+
+            with convert_stages[current_period]:
+                if current_period not in outputs:
+                    open_output(current_period)
+                if latest_period is not None and current_period > latest_period:
+                    # In date-sorted books, the earlier periods are complete now; don't hold their buffers:
+                    for earlier_period in range(latest_period, current_period):
+                        if earlier_period in outputs:
+                            datev_files[earlier_period].flush_stream()
+                add_transaction_to_datev_file(datev_files[current_period], splits, accounts_file)
+            convert_stages[current_period].rows += 1
+            latest_period = current_period if latest_period is None else max(latest_period, current_period)
+
+        summaries = []
+
+        for current_period, fn in enumerate(filenames):
+            if not dirty_periods[current_period]:
+                _print_period_skipped(print_message_function, periods, current_period, fn)
+                continue
+
+            if current_period not in outputs:  # a period without bookings still gets its (empty) file
+                open_output(current_period)
+
+            datev_files[current_period].flush_stream()
+            outputs.pop(current_period).close()
+            os.replace(fn + ".tmp", fn)
+
+            instrumentation.report(convert_stages[current_period])
+            instrumentation.report(write_stages[current_period])
+            _print_period_written(print_message_function, periods, current_period, convert_stages[current_period].rows, fn)
+
+            start, end = periods[current_period]
+            summaries.append(DatevFileSummary(fn, start, end, len(datev_files[current_period].rows),
+                                              convert_stages[current_period].rows, write_stages[current_period].bytes))
+            datev_files[current_period] = None  # nothing of it is needed anymore
+    finally:
+        for current_period, f in outputs.items():  # only left if the conversion failed
+            f.close()
+            os.remove(filenames[current_period] + ".tmp")
+
+    return summaries
+
+
+def _print_period_written(print_message_function: Callable[[str], None], periods: Periods, current_period: int,
+                          transaction_count: int, fn: str):
+    start, end = periods[current_period]
+    print_message_function(
+        f" - Wrote output file {current_period+1}/{len(periods)} ({start} to {end}) "
+        f"containing {transaction_count} bookings to \"{fn}\"")
+
+
+def _print_period_skipped(print_message_function: Callable[[str], None], periods: Periods, current_period: int,
+                          fn: str):
+    start, end = periods[current_period]
+    print_message_function(
+        f" - Skipped output file {current_period+1}/{len(periods)} ({start} to {end}), \"{fn}\" is up to date")
+
+
+def add_transaction_to_datev_file(datev_file: dt.BookingsCSVFile,
+                                  splits: List[gc.Booking],
+                                  accounts_file: gc.AccountsCSVFile):
+    """
+    Convert the splits of a single GnuCash transaction into DATEV bookings and add them to
+    the given DATEV file. Since DATEV doesn't support split transactions, one booking is
+    created per split against the transaction's single contra split. Transactions with several
+    debit and several credit splits are decomposed into bookings between pairs of splits (see
+    `decompose_splits`).
+    """
+
+    transaction_id = splits[0].transaction_id
+
+    debit_splits = [b for b in splits if b.amount_num < 0]
+    credit_splits = [b for b in splits if b.amount_num > 0]
+
+    bookings = []
+
+    for booking, contra_booking, amount in decompose_splits(debit_splits, credit_splits):
+        contra_account = accounts_file.get_account_by_full_name(contra_booking.full_account_name)
+
+        if not contra_account:
+            raise ValueError(f"Account \"{contra_booking.full_account_name}\" from booking \"{contra_booking.description}\" "
+                             f"cannot be found in the exported account file. This potentially indicates that the"
+                             f"supplied booking CSV export doesn't match the supplied accounts CSV export.")
+
+        account = accounts_file.get_account_by_full_name(booking.full_account_name)
+
+        if not account:
+            raise ValueError(f"Account \"{booking.full_account_name}\" from booking \"{booking.description}\" "
+                             f"cannot be found in the exported account file. This potentially indicates that "
+                             f"the supplied booking CSV export doesn't match the supplied accounts CSV export.")
+
+        booking_fields = {
+            'revenue': amount,
+            'document_date': booking.date,
+            'posting_text': truncate_string(booking.description, 60),
+            'account': int(account.account_code),
+            'contra_account_without_bu_key': int(contra_account.account_code),
+            'debit_credit_indicator': 'S' if booking.amount_num > 0 else 'H',  # S = debit, H = credit
+            'additional_info_type_1': "OriginalGnuCashTransactionId",
+            'additional_info_content_1': transaction_id,
+        }
+        if len(booking.description) > 60:
+            booking_fields['additional_info_type_2'] = 'OriginalTransactionDescription'
+            booking_fields['additional_info_content_2'] = truncate_string(booking.description, 210)
+        bookings.append(booking_fields)
+
+    datev_file.add_bookings(bookings)
+
+
 def ensure_correct_exports_order(accounts_fd: TextIO, bookings_fd: TextIO, print_warning: bool = True) -> tuple[TextIO, TextIO]:
     """
     Check if the files were given in the right order first, and swap them if necessary. The current
@@ -158,35 +609,158 @@ def ensure_correct_exports_order(accounts_fd: TextIO, bookings_fd: TextIO, print
 
 if __name__ == '__main__':
     import argparse
+    import cProfile
 
     parser = argparse.ArgumentParser()
 
-    parser.add_argument("accounts-csv-export", help="The path to the Account Tree CSV file exported from GnuCash")
-    parser.add_argument("transactions-csv-export",
+    parser.add_argument("accounts-csv-export", nargs='?',
+                        help="The path to the Account Tree CSV file exported from GnuCash")
+    parser.add_argument("transactions-csv-export", nargs='?',
                         help="The path to the Transactions CSV file exported from GnuCash")
 
+    parser.add_argument("--gnucash-book", default=None,
+                        help="The path to a GnuCash book file (XML or SQLite format), to convert instead of CSV exports")
+    parser.add_argument("--start-date", default=None,
+                        help="Only convert transactions from this date on (YYYY-MM-DD). Default: the first transaction")
+    parser.add_argument("--end-date", default=None,
+                        help="Only convert transactions up to this date (YYYY-MM-DD). Default: the last transaction")
+
+    parser.add_argument("--watch", default=None, metavar="FOLDER",
+                        help="Keep running and convert the GnuCash CSV exports in FOLDER whenever they change, instead of "
+                             "converting the given exports once. Each pair of accounts/transactions exports is converted "
+                             "incrementally into a subfolder of the output folder.")
+    parser.add_argument("--debounce", type=float, default=2.0, metavar="SECONDS",
+                        help="With --watch, wait until the exports did not change for this long before converting them. "
+                             "Default: 2")
+
     parser.add_argument("--financial-year-start", default=None,
                         help="Start of the financial year in YYYY-MM-DD. If omitted, Jan 1 is used for each year")
     parser.add_argument("--output-folder", default=os.path.realpath("."),
                         help="Path to the output folder to place DATEV files in. Default: current folder")
-    parser.add_argument("--title", default=None, help="Title of the exported DATEV files")
+    parser.add_argument("--title", default=None,
+                        help="Title of the exported DATEV files. Default: \"Buchungen YYYY-MM bis YYYY-MM\" with the "
+                             "first and last month of each file")
+
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Number of processes to build and write the yearly DATEV files with. Default: 1")
+
+    parser.add_argument("--streaming", action='store_true',
+                        help="Write each booking to its DATEV file right away, instead of collecting all bookings "
+                             "in memory first. Not compatible with --jobs")
+    parser.add_argument("--zip", default=None, metavar="ZIP_FILE",
+                        help="Write all DATEV files into this ZIP file instead of the output folder. Not compatible "
+                             "with --streaming and --incremental")
+    parser.add_argument("--incremental", action='store_true',
+                        help="Only regenerate DATEV files whose bookings or options changed since the last run "
+                             "into the output folder")
+
+    parser.add_argument("--cache-dir", default=None,
+                        help="Path to a folder to cache generated DATEV files in, such that repeated conversions "
+                             "of the same exports with the same options are served from the cache")
+    parser.add_argument("--cache-size", type=int, default=1024,
+                        help="Maximum size of the cache in MiB. Least recently used entries are evicted. Default: 1024")
+
+    parser.add_argument("--profile", nargs='?', const=True, default=None, metavar="CPROFILE_OUTPUT",
+                        help="Print the time spent in each conversion stage afterwards. If a path is given, "
+                             "cProfile statistics of the conversion are written to it as well.")
+
+    parser.add_argument("--unsorted-exports", nargs='?', type=int, const=512, default=None, metavar="MEMORY_MIB",
+                        help="Allow the splits of a transaction to appear anywhere in the transactions export (e.g. for "
+                             "re-sorted or concatenated exports). They are grouped in up to MEMORY_MIB of memory, and "
+                             "in temporary files beyond that. Default: 512")
 
     parser.add_argument("--no-check-exports-order", action='store_true',
                         help="Do not check and correct the order in which input files are given. This flag is usually not needed.")
 
     args = parser.parse_args(sys.argv[1:])
 
-    with open(getattr(args, 'accounts-csv-export')) as accounts_fd:
-        with open(getattr(args, 'transactions-csv-export')) as bookings_fd:
-            if not args.no_check_exports_order:
-                accounts_fd, bookings_fd = ensure_correct_exports_order(accounts_fd, bookings_fd)
+    if args.streaming and args.jobs > 1:
+        parser.error("--streaming can't be combined with --jobs")
+    if args.zip and (args.streaming or args.incremental or args.watch):
+        parser.error("--zip can't be combined with --streaming, --incremental or --watch")
+
+    if args.watch and (args.gnucash_book or getattr(args, 'accounts-csv-export')):
+        parser.error("--watch converts the exports in FOLDER, so it can't be combined with CSV exports or --gnucash-book")
+    if args.watch and args.no_check_exports_order:
+        parser.error("--no-check-exports-order can't be combined with --watch, which pairs exports by their file names")
+
+    group_memory_budget = args.unsorted_exports * 1024 * 1024 if args.unsorted_exports is not None else None
+
+    instrumentation = Instrumentation() if args.profile else None
+    profiler = cProfile.Profile() if isinstance(args.profile, str) else None
+
+    if args.watch:
+        if profiler:
+            profiler.enable()
 
-            # Run the conversion:
-            convert_gnucash_to_datev(
-                gnucash_accounts_export_fd=accounts_fd,
-                gnucash_bookings_export_fd=bookings_fd,
+        try:
+            watch_gnucash_exports(
+                input_dir=args.watch,
                 datev_output_dir=args.output_folder,
+                print_message_function=print,
+                debounce=args.debounce,
+                start_date=parse_any_date(args.start_date),
+                end_date=parse_any_date(args.end_date),
                 title=args.title,
                 financial_year_start=parse_any_date(args.financial_year_start),
-                print_message_function=print,
+                workers=args.jobs,
+                instrumentation=instrumentation,
+                cache=ResultCache(args.cache_dir, args.cache_size * 1024 * 1024) if args.cache_dir else None,
+                streaming=args.streaming,
+                group_memory_budget=group_memory_budget,
             )
+        except KeyboardInterrupt:
+            pass
+
+        # Profiling covers all conversions done until interrupted:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+
+        if instrumentation:
+            print()
+            print(instrumentation.format_table())
+
+        sys.exit(0)
+
+    if not args.gnucash_book and not (getattr(args, 'accounts-csv-export') and getattr(args, 'transactions-csv-export')):
+        parser.error("either both CSV exports or --gnucash-book are required")
+
+    with contextlib.ExitStack() as stack:
+        if args.gnucash_book:
+            book = open_gnucash_book(args.gnucash_book)
+            stack.callback(book.close)
+        else:
+            accounts_fd = stack.enter_context(open(getattr(args, 'accounts-csv-export')))
+            bookings_fd = stack.enter_context(open(getattr(args, 'transactions-csv-export')))
+            if not args.no_check_exports_order:
+                accounts_fd, bookings_fd = ensure_correct_exports_order(accounts_fd, bookings_fd)
+            book = CSVExportsBook(accounts_fd, bookings_fd, group_memory_budget=group_memory_budget)
+
+        if profiler:
+            profiler.enable()
+
+        # Run the conversion:
+        convert_gnucash_book_to_datev(
+            book=book,
+            start_date=parse_any_date(args.start_date),
+            end_date=parse_any_date(args.end_date),
+            datev_output_dir=args.output_folder,
+            title=args.title,
+            financial_year_start=parse_any_date(args.financial_year_start),
+            print_message_function=print,
+            workers=args.jobs,
+            instrumentation=instrumentation,
+            incremental=args.incremental,
+            cache=ResultCache(args.cache_dir, args.cache_size * 1024 * 1024) if args.cache_dir else None,
+            streaming=args.streaming,
+            zip_output=args.zip,
+        )
+
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+
+        if instrumentation:
+            print()
+            print(instrumentation.format_table())
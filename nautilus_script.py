@@ -6,8 +6,12 @@ import traceback
 from urllib.parse import unquote, urlparse
 
 import main
+from src.result_cache import ResultCache
 from src.utils import parse_any_date
 
+# Converted files are only cached if this folder exists, i.e. if the user created it:
+CACHE_DIR = os.path.join(os.getenv('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'gnutev')
+
 
 def _show_error_dialog(title: str, text: str):
     import subprocess
@@ -50,16 +54,17 @@ if __name__ == '__main__':
                 accounts_fd, bookings_fd = main.ensure_correct_exports_order(accounts_fd, bookings_fd, print_warning=False)
 
                 # Run the conversion:
-                datev_files = main.convert_gnucash_to_datev(
+                main.convert_gnucash_to_datev(
                     gnucash_accounts_export_fd=accounts_fd,
                     gnucash_bookings_export_fd=bookings_fd,
                     datev_output_dir=cwd,
                     title=title.strip() or None,
                     financial_year_start=parse_any_date(date.strip()) if date.strip() else None,
                     print_message_function=lambda text: logs.append(text),
+                    cache=ResultCache(CACHE_DIR) if os.path.isdir(CACHE_DIR) else None,
                 )
 
-        subprocess.Popen(['notify-send', 'Conversion succeeded', f"{len(datev_files)} DATEV-compatible {'file' if len(datev_files) == 1 else 'files'} successfully created."]).communicate()
+        subprocess.Popen(['notify-send', 'Conversion succeeded', logs[-1]]).communicate()  # the summary message
     except:
         _show_error_dialog('Conversion Failed', traceback.format_exc())
         raise
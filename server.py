@@ -0,0 +1,303 @@
+#!/usr/bin/python3
+
+import asyncio
+import os
+import re
+import sys
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from typing import BinaryIO, Dict, Tuple
+from urllib.parse import parse_qs, quote, urlsplit
+
+import main
+from src.utils import parse_any_date
+
+HOST = '127.0.0.1'  # the service is only reachable from this machine
+DEFAULT_PORT = 8470
+DEFAULT_MAX_UPLOAD_SIZE = 1 << 30  # 1 GiB
+
+STREAM_LIMIT = 1 << 20  # bytes buffered per connection while looking for multipart boundaries
+CHUNK_SIZE = 1 << 16
+READ_TIMEOUT = 60  # seconds to wait for a request's headers, or for its body to be completely received
+
+# Query parameters of POST /convert and their corresponding `convert_gnucash_to_datev` parameters:
+CONVERSION_OPTIONS = {
+    'title': 'title',
+    'file_title': 'datev_output_file_title',
+    'financial_year_start': 'financial_year_start',
+    'start_date': 'start_date',
+    'end_date': 'end_date',
+    'skr_number': 'skr_number',
+}
+
+USAGE = """GnuTev conversion service
+
+POST /convert with a multipart/form-data body containing the GnuCash exports as fields "accounts"
+and "transactions", e.g.:
+
+    curl -F accounts=@Accounts.csv -F transactions=@Transactions.csv -OJ http://localhost:{port}/convert
+
+Returns the DATEV file, or a ZIP file if the bookings span several years. Optional query parameters:
+{options}.
+"""
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str | None = None):
+        super().__init__(message or HTTPStatus(status).phrase)
+        self.status = status
+
+
+class ConversionServer:
+    """
+    A small HTTP service converting uploaded GnuCash exports into DATEV files, see `USAGE`.
+
+    Uploads are written to temporary files as they arrive, so memory usage doesn't depend on
+    their size. Conversions run on a pool of `workers` processes, such that the event loop keeps
+    serving other requests meanwhile; requests beyond `max_pending` concurrent conversions are
+    rejected with "503 Service Unavailable".
+    """
+
+    def __init__(self, port: int = DEFAULT_PORT, workers: int = 1, max_pending: int | None = None,
+                 max_upload_size: int = DEFAULT_MAX_UPLOAD_SIZE):
+        self.port = port
+        self.max_upload_size = max_upload_size
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self._pending = asyncio.Semaphore(max_pending or workers * 4)
+
+    async def serve_forever(self):
+        server = await asyncio.start_server(self._handle_connection, HOST, self.port, limit=STREAM_LIMIT)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            try:
+                await self._handle_request(reader, writer)
+            except HTTPError as e:
+                await _send_response(writer, e.status, {'Content-Type': 'text/plain; charset=utf-8'},
+                                     f"{e}\n".encode())
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # the client went away
+        finally:
+            writer.close()
+
+    async def _handle_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line, headers = await asyncio.wait_for(_read_request_head(reader), READ_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise HTTPError(408)
+
+        try:
+            method, target, _ = request_line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(400)
+
+        url = urlsplit(target)
+
+        if url.path == '/' and method == 'GET':
+            options = ', '.join(f'"{option}"' for option in CONVERSION_OPTIONS)
+            body = USAGE.format(port=self.port, options=options).encode()
+            return await _send_response(writer, 200, {'Content-Type': 'text/plain; charset=utf-8'}, body)
+        elif url.path != '/convert':
+            raise HTTPError(404)
+        elif method != 'POST':
+            raise HTTPError(405)
+
+        query = parse_qs(url.query)
+        unknown = set(query) - set(CONVERSION_OPTIONS)
+        if unknown:
+            raise HTTPError(400, f"Unknown query parameter(s): {', '.join(sorted(unknown))}")
+        options = {CONVERSION_OPTIONS[key]: values[-1] for key, values in query.items()}
+
+        boundary = re.search(r'boundary="?([^";]+)"?', headers.get('content-type', ''))
+        if not headers.get('content-type', '').startswith('multipart/form-data') or not boundary:
+            raise HTTPError(400, "Expected a multipart/form-data body")
+        if headers.get('transfer-encoding', 'identity').lower() != 'identity' or 'content-length' not in headers:
+            raise HTTPError(411, "Uploads need a Content-Length (chunked transfer encoding is not supported)")
+        try:
+            content_length = int(headers['content-length'])
+            if content_length < 0:
+                raise ValueError
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length header")
+        if content_length > self.max_upload_size:
+            raise HTTPError(413)
+
+        if self._pending.locked():
+            raise HTTPError(503, "Too many conversions in progress, try again later")
+
+        async with self._pending:
+            with tempfile.TemporaryDirectory(prefix='gnutev-') as tmp_dir:
+                paths = {name: os.path.join(tmp_dir, f'{name}.csv') for name in ('accounts', 'transactions')}
+
+                if headers.get('expect', '').lower() == '100-continue':
+                    writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+
+                with open(paths['accounts'], 'wb') as accounts, open(paths['transactions'], 'wb') as transactions:
+                    try:
+                        received = await asyncio.wait_for(
+                            _read_multipart(reader, boundary.group(1).encode('latin-1'),
+                                            {'accounts': accounts, 'transactions': transactions},
+                                            self.max_upload_size),
+                            READ_TIMEOUT)
+                    except asyncio.TimeoutError:
+                        raise HTTPError(408)
+
+                if received != set(paths):
+                    raise HTTPError(400, "Both the \"accounts\" and the \"transactions\" export are required")
+
+                try:
+                    path, filename, content_type = await asyncio.get_running_loop().run_in_executor(
+                        self.executor, _convert_uploads, paths['accounts'], paths['transactions'],
+                        os.path.join(tmp_dir, 'datev'), options)
+                except Exception as e:
+                    raise HTTPError(422, f"The conversion failed: {e}")
+
+                await _send_file(writer, path, filename, content_type)
+
+
+def _convert_uploads(accounts_path: str, transactions_path: str, output_dir: str,
+                     options: Dict[str, str]) -> Tuple[str, str, str]:
+    # Runs in a worker process; returns the path, file name and content type of the response
+    for key in ('financial_year_start', 'start_date', 'end_date'):
+        if key in options:
+            options[key] = parse_any_date(options[key])
+
+    os.makedirs(output_dir)
+
+    with open(accounts_path) as accounts_fd, open(transactions_path) as bookings_fd:
+        accounts_fd, bookings_fd = main.ensure_correct_exports_order(accounts_fd, bookings_fd, print_warning=False)
+        main.convert_gnucash_to_datev(accounts_fd, bookings_fd, datev_output_dir=output_dir, **options)
+
+    filenames = sorted(os.listdir(output_dir))
+
+    if len(filenames) == 1:
+        return os.path.join(output_dir, filenames[0]), filenames[0], 'text/csv'
+
+    zip_path = output_dir + '.zip'
+    with zipfile.ZipFile(zip_path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for fn in filenames:
+            zf.write(os.path.join(output_dir, fn), fn)
+
+    return zip_path, f"{options.get('datev_output_file_title') or options.get('title') or 'DATEV'}.zip", 'application/zip'
+
+
+async def _read_request_head(reader: asyncio.StreamReader) -> Tuple[bytes, Dict[str, str]]:
+    return await _readline(reader), await _read_headers(reader)
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    headers = {}
+    while (line := await _readline(reader)) not in (b'\r\n', b'\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return headers
+
+
+async def _readline(reader: asyncio.StreamReader) -> bytes:
+    try:
+        return await reader.readline()
+    except (asyncio.LimitOverrunError, ValueError):  # `readline` raises ValueError if the line exceeds the limit
+        raise HTTPError(400, "Line too long")
+
+
+async def _read_multipart(reader: asyncio.StreamReader, boundary: bytes, files: Dict[str, BinaryIO],
+                          max_size: int) -> set:
+    """
+    Stream the parts of a multipart/form-data body into the file of the same name in `files`,
+    discarding any other parts. Returns the names of the received parts.
+    """
+
+    if (await _readline(reader)).rstrip(b'\r\n') != b'--' + boundary:
+        raise HTTPError(400, "Malformed multipart body")
+
+    delimiter = b'\r\n--' + boundary
+    received = set()
+    size = 0
+
+    while True:
+        disposition = (await _read_headers(reader)).get('content-disposition', '')
+        name = re.search(r'\bname="([^"]*)"', disposition)
+        out = files.get(name.group(1)) if name else None
+        if out:
+            received.add(name.group(1))
+
+        while True:
+            try:
+                data = (await reader.readuntil(delimiter))[:-len(delimiter)]
+                complete = True
+            except asyncio.LimitOverrunError as e:  # no delimiter in the buffered data (yet)
+                data = await reader.readexactly(e.consumed)
+                complete = False
+
+            size += len(data)
+            if size > max_size:
+                raise HTTPError(413)
+            if out:
+                out.write(data)
+            if complete:
+                break
+
+        if (await _readline(reader)).startswith(b'--'):  # the closing delimiter is "--boundary--"
+            return received
+
+
+async def _send_response(writer: asyncio.StreamWriter, status: int, headers: Dict[str, str], body: bytes = b''):
+    head = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}", f"Content-Length: {len(body)}", "Connection: close"]
+    head.extend(f"{name}: {value}" for name, value in headers.items())
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + body)
+    await writer.drain()
+
+
+async def _send_file(writer: asyncio.StreamWriter, path: str, filename: str, content_type: str):
+    head = [
+        "HTTP/1.1 200 OK", f"Content-Length: {os.path.getsize(path)}", "Connection: close",
+        f"Content-Type: {content_type}", _content_disposition(filename),
+    ]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1'))
+
+    with open(path, 'rb') as f:
+        while chunk := f.read(CHUNK_SIZE):
+            writer.write(chunk)
+            await writer.drain()
+
+
+def _content_disposition(filename: str) -> str:
+    # The file name is derived from query parameters, so it is reduced to safe characters for the
+    # plain `filename`, and percent-encoded for clients supporting `filename*` (RFC 6266/5987)
+    fallback = re.sub(r'[^A-Za-z0-9 ._()-]', '_', filename)
+    return f"Content-Disposition: attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve conversions of GnuCash exports into DATEV files over HTTP "
+                                                 f"on {HOST}. See GET / for usage.")
+
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on. Default: {DEFAULT_PORT}")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Number of conversions to run in parallel. Default: number of CPUs")
+    parser.add_argument("--max-upload-size", type=int, default=DEFAULT_MAX_UPLOAD_SIZE >> 20, metavar="MIB",
+                        help=f"Maximum size of an upload in MiB. Default: {DEFAULT_MAX_UPLOAD_SIZE >> 20}")
+
+    args = parser.parse_args(sys.argv[1:])
+
+    async def serve():
+        server = ConversionServer(port=args.port, workers=args.jobs, max_upload_size=args.max_upload_size << 20)
+        print(f"Serving on http://{HOST}:{args.port}/ – press Ctrl+C to stop")
+        try:
+            await server.serve_forever()
+        finally:
+            server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,68 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict
+
+STATE_FILENAME = '.gnutev-state.json'
+STATE_VERSION = 1
+
+
+class ConversionState:
+    """
+    Fingerprints of the inputs each DATEV file in an output folder was generated from. This is
+    persisted in a small JSON file in the output folder and allows incremental conversions to
+    skip periods whose inputs did not change since the last run.
+    """
+
+    def __init__(self, path: str, fingerprints: Dict[str, str] | None = None):
+        self.path = path
+        self.fingerprints: Dict[str, str] = fingerprints or {}  # by output file name
+
+    @classmethod
+    def load(cls, output_dir: str) -> 'ConversionState':
+        """
+        Load the state of the given output folder. A missing, unreadable or outdated state file
+        results in an empty state, i.e. all periods are regenerated.
+        """
+
+        path = os.path.join(output_dir, STATE_FILENAME)
+
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+
+        if not isinstance(data, dict) or data.get('version') != STATE_VERSION:
+            return cls(path)
+
+        return cls(path, dict(data.get('files', {})))
+
+    def is_current(self, fn: str, fingerprint: str) -> bool:
+        """
+        Whether the output file `fn` exists and was generated from inputs with the given fingerprint.
+        """
+        return self.fingerprints.get(os.path.basename(fn)) == fingerprint and os.path.exists(fn)
+
+    def update(self, fn: str, fingerprint: str):
+        self.fingerprints[os.path.basename(fn)] = fingerprint
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': STATE_VERSION, 'files': self.fingerprints}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)  # atomically, such that an interrupted run can't corrupt the state
+
+
+def fingerprint(*parts: Any) -> str:
+    """
+    Return a hex digest identifying the given parts (which are converted using `repr`).
+    """
+
+    h = hashlib.sha256()
+
+    for part in parts:
+        h.update(repr(part).encode())
+        h.update(b'\0')
+
+    return h.hexdigest()
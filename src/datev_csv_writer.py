@@ -1,35 +1,208 @@
 from _decimal import Decimal
-from typing import Iterable, Any
+from typing import Iterable, Iterator, Any, Callable, Dict, List, Sequence, Tuple
+
+# Column types for `DatevCSVWriter.writerows`:
+NUMERIC = 'numeric'
+DATE = 'date'
+TEXT = 'text'
+
+# Number of characters `DatevCSVWriter.writerows` collects before writing them out at once:
+DEFAULT_BUFFER_SIZE = 1 << 20
 
 
 class DatevCSVWriter:
     """
     Drop-in replacement for the builtin `csv.writer` since it doesn't support formatting
     numbers using a different fraction separator (",") without quoting them.
+
+    If an `encoding` is given, `outfd` is expected to be a binary writeable (e.g. a file opened
+    in "wb" mode or a `BytesIO`) and the output is encoded directly, bypassing any text layer.
     """
 
-    def __init__(self, outfd: 'SupportsWrite[str]', quotechar='"', delimiter=';', fraction_separator=",", newline="\r\n"):
+    def __init__(self, outfd: 'SupportsWrite[str] | SupportsWrite[bytes] | None', quotechar='"', delimiter=';',
+                 fraction_separator=",", newline="\r\n", encoding: str | None = None,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE):
         self.outfd = outfd
         self.quotechar = quotechar
         self.delimiter = delimiter
         self.fraction_separator = fraction_separator
         self.newline = newline
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+
+        # Fragments between populated cells of sparse rows, by row layout (see `writerows`):
+        self._layout_fragments: Dict[Tuple[int, Tuple[int, ...]], List[str]] = {}
 
     def writerow(self, row: Iterable[Any]):
-        strings = []
+        self._write(self.delimiter.join(map(self._format_cell, row)) + self.newline)
+
+    def writerows(self, rows: Iterable[Any], column_types: Sequence[str] = ()):
+        """
+        Write many rows at once. This produces the same output as calling `writerow` for each
+        row, but is considerably faster for rows of a fixed schema. Rows are collected and
+        written out in chunks of about `buffer_size` characters:
+
+        :param rows: The rows to write. Rows providing `columns` and `values` (like
+            `datev_file.SparseRow`) only have their populated cells formatted; the empty cells
+            in between are emitted as precomputed fragments.
+        :param column_types: The expected type of each column (`NUMERIC`, `DATE` or `TEXT`),
+            used to pick a specialised formatter per column. Cells not matching their column's
+            type are still formatted correctly, just not as fast.
+        """
+
+        for chunk in self.iter_rows(rows, column_types):
+            self.outfd.write(chunk)
+
+    def iter_rows(self, rows: Iterable[Any], column_types: Sequence[str] = ()) -> Iterator[str | bytes]:
+        """
+        Like `writerows`, but yield the chunks of about `buffer_size` characters instead of
+        writing them to `outfd` (which may be None then). Chunks are encoded if an `encoding`
+        is given. Rows are consumed lazily, as the chunks are requested.
+        """
+
+        plan = self._compile_plan(column_types)
+        format_line = self._format_line
+        encoding = self.encoding
+        buffer = []
+        buffered = 0
+
+        for row in rows:
+            line = format_line(row, plan)
+            buffer.append(line)
+            buffered += len(line)
+
+            if buffered >= self.buffer_size:
+                chunk = "".join(buffer)
+                yield chunk.encode(encoding) if encoding else chunk
+                buffer.clear()
+                buffered = 0
+
+        if buffer:
+            chunk = "".join(buffer)
+            yield chunk.encode(encoding) if encoding else chunk
+
+    def stream_rows(self, column_types: Sequence[str] = ()) -> 'RowStream':
+        """
+        Return a `RowStream`, which formats and writes rows as they are appended to it, like
+        `writerows` does for all rows at once. Call `flush` on it after the last row.
+        """
+        return RowStream(self, column_types)
+
+    def _format_line(self, row: Any, plan: List[Callable[[Any], str]]) -> str:
+        if len(row) > len(plan):  # columns without a type are formatted generically
+            plan.extend([self._format_cell] * (len(row) - len(plan)))
+
+        if hasattr(row, 'columns'):
+            layout = (len(row), row.columns)
+            fragments = self._layout_fragments.get(layout)
+            if fragments is None:
+                fragments = self._layout_fragments[layout] = self._compile_layout(*layout)
+
+            parts = [fragments[0]]
+            for column, value, fragment in zip(row.columns, row.values, fragments[1:]):
+                parts.append(plan[column](value))
+                parts.append(fragment)
+            return "".join(parts)
+
+        return self.delimiter.join([plan[i](el) for i, el in enumerate(row)]) + self.newline
+
+    def _write(self, string: str):
+        self.outfd.write(string.encode(self.encoding) if self.encoding else string)
+
+    def _format_cell(self, el: Any) -> str:
+        string = str(el) if el is not None else ""
+        string = string.replace(self.quotechar, 2*self.quotechar)  # double any quote chars
+
+        # Replace fraction separator in floats and Decimals:
+        if isinstance(el, float) or isinstance(el, Decimal):
+            string = string.replace(".", self.fraction_separator)
+
+        # Quote all non-numerics:
+        if not isinstance(el, float) and not isinstance(el, Decimal) and not isinstance(el, int):
+            string = self.quotechar + string + self.quotechar
+
+        return string
+
+    def _compile_plan(self, column_types: Sequence[str]) -> List[Callable[[Any], str]]:
+        quotechar, fraction_separator, format_cell = self.quotechar, self.fraction_separator, self._format_cell
+        escaped_quotechar = 2*quotechar
+
+        def format_numeric(el: Any) -> str:
+            t = type(el)
+            if t is int:
+                return str(el)
+            if t is Decimal or t is float:
+                return str(el).replace(".", fraction_separator)
+            return format_cell(el)
+
+        def format_text(el: Any) -> str:
+            if type(el) is str:
+                return quotechar + el.replace(quotechar, escaped_quotechar) + quotechar
+            return format_cell(el)
+
+        # DATEV dates are passed as preformatted strings, and thus are written like text:
+        formatters = {NUMERIC: format_numeric, DATE: format_text, TEXT: format_text}
+        return [formatters.get(t, format_cell) for t in column_types]
+
+    def _compile_layout(self, length: int, columns: Tuple[int, ...]) -> List[str]:
+        """
+        Precompute the constant fragments around the populated `columns` of a row: the empty
+        cells before the first column, between each two columns and after the last one.
+        """
+
+        empty_cell = self._format_cell(None)
+
+        if not columns:  # the row is entirely empty
+            return [self.delimiter.join([empty_cell] * length) + self.newline]
+
+        fragments = []
+        prev = -1
+
+        for column in columns:
+            leading_delimiter = self.delimiter if prev >= 0 else ''
+            fragments.append(leading_delimiter + (empty_cell + self.delimiter) * (column - prev - 1))
+            prev = column
+
+        fragments.append((self.delimiter + empty_cell) * (length - prev - 1) + self.newline)
+
+        return fragments
+
+
+class RowStream:
+    """
+    A list-like sink for rows: each appended row is formatted right away and written out in
+    chunks of about `buffer_size` characters (see `DatevCSVWriter.stream_rows`). Only the number
+    of rows is kept, which is returned by `len`.
+    """
+
+    def __init__(self, writer: DatevCSVWriter, column_types: Sequence[str] = ()):
+        self.writer = writer
+        self._plan = writer._compile_plan(column_types)
+        self._buffer = []
+        self._buffered = 0
+        self._count = 0
 
-        for el in row:
-            string = str(el) if el is not None else ""
-            string = string.replace(self.quotechar, 2*self.quotechar)  # double any quote chars
+    def append(self, row: Any):
+        line = self.writer._format_line(row, self._plan)
+        self._buffer.append(line)
+        self._buffered += len(line)
+        self._count += 1
 
-            # Replace fraction separator in floats and Decimals:
-            if isinstance(el, float) or isinstance(el, Decimal):
-                string = string.replace(".", self.fraction_separator)
+        if self._buffered >= self.writer.buffer_size:
+            self.flush()
 
-            # Quote all non-numerics:
-            if not isinstance(el, float) and not isinstance(el, Decimal) and not isinstance(el, int):
-                string = self.quotechar + string + self.quotechar
+    def extend(self, rows: Iterable[Any]):
+        for row in rows:
+            self.append(row)
 
-            strings.append(string)
+    def flush(self):
+        """
+        Write out the buffered rows.
+        """
+        if self._buffer:
+            self.writer._write("".join(self._buffer))
+            self._buffer.clear()
+            self._buffered = 0
 
-        self.outfd.write(self.delimiter.join(strings) + self.newline)
+    def __len__(self) -> int:
+        return self._count
@@ -1,12 +1,71 @@
+import csv
 import datetime
+import inspect
+from bisect import bisect_left
 from _decimal import Decimal
-from io import StringIO
+from functools import lru_cache
+from io import StringIO, BytesIO
+from itertools import compress, repeat
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping, Sequence, Tuple
 
-from .datev_csv_writer import DatevCSVWriter
+from .datev_csv_writer import DatevCSVWriter, RowStream, NUMERIC, DATE, TEXT, DEFAULT_BUFFER_SIZE
 from .utils import parse_any_date, AnyDateRepresentation
 
 DEFAULT_SKR_NUMBER = '04'
 
+# Types of the non-text booking columns, by their title (see https://developer.datev.de/datev/platform/en/dtvf/formate/buchungsstapel):
+COLUMN_TYPES = {
+    'Umsatz (ohne Soll/Haben-Kz)': NUMERIC, 'Kurs': NUMERIC, 'Basis-Umsatz': NUMERIC, 'Konto': NUMERIC,
+    'Gegenkonto (ohne BU-Schlüssel)': NUMERIC, 'Belegdatum': DATE, 'Skonto': NUMERIC, 'Postensperre': NUMERIC,
+    'Geschäftspartnerbank': NUMERIC, 'Sachverhalt': NUMERIC, 'Zinssperre': NUMERIC, 'Kost-Menge': NUMERIC,
+    'EU-Steuersatz': NUMERIC, 'Sachverhalt L+L': NUMERIC, 'Funktionsergänzung L+L': NUMERIC,
+    'BU 49 Hauptfunktionstyp': NUMERIC, 'BU 49 Hauptfunktionsnummer': NUMERIC, 'BU 49 Funktionsergänzung': NUMERIC,
+    'Stück': NUMERIC, 'Gewicht': NUMERIC, 'Zahlweise': NUMERIC, 'Veranlagungsjahr': NUMERIC,
+    'Zugeordnete Fälligkeit': DATE, 'Skontotyp': NUMERIC, 'USt-Schlüssel (Anzahlungen)': NUMERIC,
+    'Sachverhalt L+L (Anzahlungen)': NUMERIC, 'EU-Steuersatz (Anzahlungen)': NUMERIC,
+    'Erlöskonto (Anzahlungen)': NUMERIC, 'KOST-Datum': DATE, 'Skontosperre': NUMERIC, 'Beteiligtennummer': NUMERIC,
+    'Postensperre bis': DATE, 'Kennzeichen SoBil-Buchung': NUMERIC, 'Festschreibung': NUMERIC,
+    'Leistungsdatum': DATE, 'Datum Zuord. Steuerperiode': DATE, 'Fälligkeit': DATE, 'Steuersatz': NUMERIC,
+}
+
+# The `BookingsCSVFile.add_booking` parameter of each booking column; None denotes the unused field #103:
+BOOKING_FIELDS = (
+    'revenue', 'debit_credit_indicator', 'currency_code_revenue', 'exchange_rate', 'base_revenue',
+    'currency_code_base_revenue', 'account', 'contra_account_without_bu_key', 'bu_key', 'document_date',
+    'document_field_1', 'document_field_2', 'discount', 'posting_text', 'item_block',
+    'miscellaneous_address_number', 'business_partner_bank', 'issue', 'interest_lock', 'document_link',
+    'document_info_type_1', 'document_info_content_1', 'document_info_type_2', 'document_info_content_2',
+    'document_info_type_3', 'document_info_content_3', 'document_info_type_4', 'document_info_content_4',
+    'document_info_type_5', 'document_info_content_5', 'document_info_type_6', 'document_info_content_6',
+    'document_info_type_7', 'document_info_content_7', 'document_info_type_8', 'document_info_content_8',
+    'cost_center_1', 'cost_center_2', 'cost_quantity', 'eu_member_state_and_vat_id_determination',
+    'eu_tax_rate_determination', 'alternate_taxation', 'issue_p_l', 'function_complement_p_l',
+    'bu_49_main_function_type', 'bu_49_main_function_number', 'bu_49_function_complement', 'additional_info_type_1',
+    'additional_info_content_1', 'additional_info_type_2', 'additional_info_content_2', 'additional_info_type_3',
+    'additional_info_content_3', 'additional_info_type_4', 'additional_info_content_4', 'additional_info_type_5',
+    'additional_info_content_5', 'additional_info_type_6', 'additional_info_content_6', 'additional_info_type_7',
+    'additional_info_content_7', 'additional_info_type_8', 'additional_info_content_8', 'additional_info_type_9',
+    'additional_info_content_9', 'additional_info_type_10', 'additional_info_content_10', 'additional_info_type_11',
+    'additional_info_content_11', 'additional_info_type_12', 'additional_info_content_12',
+    'additional_info_type_13', 'additional_info_content_13', 'additional_info_type_14',
+    'additional_info_content_14', 'additional_info_type_15', 'additional_info_content_15',
+    'additional_info_type_16', 'additional_info_content_16', 'additional_info_type_17',
+    'additional_info_content_17', 'additional_info_type_18', 'additional_info_content_18',
+    'additional_info_type_19', 'additional_info_content_19', 'additional_info_type_20',
+    'additional_info_content_20', 'quantity', 'weight', 'payment_method', 'claim_type', 'assessment_year',
+    'associated_due_date', 'discount_type', 'order_number', 'booking_type', 'vat_key_installments',
+    'eu_member_state_installments', 'issue_p_l_installments', 'eu_tax_rate_installments',
+    'revenue_account_installments', 'source_code', None, 'cost_center_date', 'sepa_mandate_reference',
+    'discount_lock', 'shareholder_name', 'participant_number', 'identification_number', 'signatory_number',
+    'post_block_until', 'designation_sobil_issue', 'indicator_sobil_booking', 'fixation', 'performance_date',
+    'date_assign_tax_period', 'due_date', 'general_reverse', 'tax_rate', 'country', 'billing_reference',
+    'bvv_position', 'eu_member_state_and_vat_id_origin', 'eu_tax_rate_origin',
+)
+
+# Column layouts (row length and populated column indices) shared between `SparseRow`s:
+_row_layouts: Dict[Tuple[int, Tuple[int, ...]], Tuple[int, Tuple[int, ...]]] = {}
+
 
 class BookingsCSVFile:
     def __init__(self,
@@ -63,7 +122,7 @@ class BookingsCSVFile:
             'Datum Zuord. Steuerperiode', 'Fälligkeit', 'Generalumkehr (GU)', 'Steuersatz', 'Land'
         ]
 
-        self.rows = []
+        self.rows: list[SparseRow] | RowStream = []
 
     def add_booking(self, /,
                     revenue: Decimal,
@@ -472,7 +531,7 @@ class BookingsCSVFile:
                date_assign_tax_period, due_date, general_reverse, tax_rate, country, billing_reference, bvv_position,
                eu_member_state_and_vat_id_origin, eu_tax_rate_origin]
 
-        self.rows.append(row)
+        self.rows.append(SparseRow(row))
 
     def add_booking_original_datev_argnames(self, /,
                                             umsatz: Decimal,
@@ -883,9 +942,58 @@ class BookingsCSVFile:
                abrechnungsreferenz, bvv_position_betriebsvermoegensvergleich, eu_mitgliedstaat_ustid_ursprung,
                eu_steuersatz_ursprung]
 
-        self.rows.append(row)
+        self.rows.append(SparseRow(row))
 
-    def to_csv(self, out: 'SupportsWrite[str]') -> str | None:
+    def add_bookings(self, bookings: Iterable[Mapping[str, Any] | Sequence[Any]]):
+        """
+        Add many bookings at once. This is equivalent to calling `add_booking` for each booking,
+        but considerably faster, as only the populated fields of each booking are processed.
+        Either all bookings are added, or none if one of them is invalid.
+
+        :param bookings: The bookings, each given either as a dict of `add_booking` arguments
+            (only the populated fields are needed), or as a tuple of its positional arguments
+            (`revenue`, `debit_credit_indicator`, `account`, `contra_account_without_bu_key`,
+            `document_date`, `posting_text` and optionally further fields in the order of
+            `add_booking`'s parameters).
+        """
+
+        names, defaults, plans = _BOOKING_PARAMETER_NAMES, _BOOKING_DEFAULTS, _booking_plans
+        rows = []
+        posting_texts = []
+
+        for i, booking in enumerate(bookings):
+            if isinstance(booking, (tuple, list)):
+                if not len(_BOOKING_REQUIRED_PARAMETERS) <= len(booking) <= len(names):
+                    raise TypeError(f"Booking {i + 1} has {len(booking)} fields, but between "
+                                    f"{len(_BOOKING_REQUIRED_PARAMETERS)} and {len(names)} are expected.")
+                booking = dict(zip(names, booking))
+
+            # The columns of a booking only depend on its field names, so they are determined once per set of names:
+            fields = tuple(booking)
+            plan = plans.get(fields)
+            if plan is None:
+                plan = plans[fields] = _compile_booking_plan(fields, i)
+            layout, get_values = plan
+
+            cells = defaults | booking
+            cells['document_date'] = datev_date(cells['document_date'], short=True)
+            values = get_values(cells)
+
+            if None in values:  # fields explicitly set to None are left empty
+                rows.append(SparseRow.from_cells(layout[0], dict(zip(layout[1], values))))
+            else:
+                rows.append(SparseRow.from_layout(layout, values))
+            posting_texts.append(cells['posting_text'])
+
+        # Check the posting texts of the whole batch at once, before adding any of its bookings:
+        if posting_texts and max(map(len, posting_texts)) > 60:
+            posting_text = next(text for text in posting_texts if len(text) > 60)
+            raise ValueError(f"Field `posting_text` may not be longer than 60 characters: \"{posting_text}\"")
+
+        self.rows.extend(rows)
+
+    def to_csv(self, out: 'SupportsWrite[str] | SupportsWrite[bytes] | None' = None, encoding: str | None = None,
+               buffer_size: int = DEFAULT_BUFFER_SIZE) -> str | bytes | None:
         """
         Write the so far added bookings and header information into a DATEV-compliant
         bookings CSV file. This function returns the contents of the csv file as a string,
@@ -900,33 +1008,186 @@ class BookingsCSVFile:
             If not, it just returns a string containing the csv data. If a writeable is given
             that supports the `getvalue()` method, the data is returned and written to the
             writeable.
+        :param encoding: If given, the output is encoded using this codec and written to `out`
+            as bytes, so `out` needs to be a binary writeable (e.g. a file opened in "wb" mode).
+            If `out` is omitted, the encoded contents are returned as bytes.
+        :param buffer_size: The number of characters to collect before writing them to `out`.
         :return: The csv file contents, unless a writeable is given that does not support
             reading using `output.getvalue()`
         """
 
-        io = out or StringIO()
-        writer = DatevCSVWriter(io)
+        io = out or (BytesIO() if encoding else StringIO())
 
-        writer.writerow(self.header)
-        writer.writerow(self.title_row)
+        for chunk in self.iter_csv(encoding=encoding, buffer_size=buffer_size):
+            io.write(chunk)
+
+        if hasattr(io, 'getvalue'):
+            return io.getvalue()
 
-        rows = list(self.rows)  # copy to avoid mutation
+    def iter_csv(self, encoding: str | None = None, buffer_size: int = DEFAULT_BUFFER_SIZE) -> Iterator[str | bytes]:
+        """
+        Yield the contents of the DATEV file (see `to_csv`) in chunks: first the header and title
+        rows, then the bookings in chunks of about `buffer_size` characters. This allows passing
+        the file on (e.g. to a socket, a ZIP file entry or a compressor) without ever holding it
+        in memory as a whole. The bookings are formatted as the chunks are requested.
 
-        for i, el in enumerate(rows):
-            if el is None:
-                rows[i] = ""
+        :param encoding: If given, the chunks are encoded using this codec (i.e. bytes are
+            yielded), otherwise strings are yielded.
+        """
 
-        for row in rows:
-            writer.writerow(row)
+        if isinstance(self.rows, RowStream):
+            raise ValueError("The bookings of this file were already written using `stream_to`.")
 
-        if hasattr(out, 'getvalue'):
-            return io.getvalue()
+        writer = DatevCSVWriter(None, encoding=encoding, buffer_size=buffer_size)
+
+        yield from writer.iter_rows([self.header, self.title_row])
+        yield from writer.iter_rows(self.rows, column_types=[COLUMN_TYPES.get(title, TEXT) for title in self.title_row])
+
+    def stream_to(self, out: 'SupportsWrite[str] | SupportsWrite[bytes]', encoding: str | None = None,
+                  buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """
+        Write the header information to `out` right away, and every booking added afterwards as
+        soon as it is added (in chunks of about `buffer_size` characters), instead of keeping the
+        bookings in memory until `to_csv` is called. `rows` then only counts the bookings. Call
+        `flush_stream` after adding the last booking. Bookings added before are written as well.
+
+        See `to_csv` for the parameters.
+        """
+
+        if isinstance(self.rows, RowStream):
+            raise ValueError("This file is already being streamed.")
+
+        writer = DatevCSVWriter(out, encoding=encoding, buffer_size=buffer_size)
+
+        writer.writerow(self.header)
+        writer.writerow(self.title_row)
+
+        rows, self.rows = self.rows, writer.stream_rows(
+            column_types=[COLUMN_TYPES.get(title, TEXT) for title in self.title_row])
+        self.rows.extend(rows)
+
+    def flush_stream(self):
+        """
+        Write out the bookings buffered since `stream_to` was called. Call this after the last
+        booking was added, or when no bookings are expected for a while. The output writeable is
+        not closed.
+        """
+        self.rows.flush()
 
     def get_suggested_filename(self, title: str | None = None):
         if title:
             return self.header[0] + "_" + title + ".csv"
         return "_".join(str(x) for x in self.header[:4]) + f"_{self.start_date.year}.csv"
 
+    @classmethod
+    def from_csv(cls, infd: Iterable[str]) -> 'BookingsCSVFile':
+        """
+        Read a DATEV bookings file (see `BookingsCSVReader`), e.g. to verify or amend it. Dates
+        are kept in their DATEV representation, such that `to_csv` reproduces files written by
+        this class exactly (including the header's creation timestamp).
+        """
+
+        reader = BookingsCSVReader(infd, parse_dates=False)
+
+        datev_file = cls.__new__(cls)
+        datev_file.start_date = reader.start_date
+        datev_file.header = reader.header
+        datev_file.title_row = reader.title_row
+        datev_file.rows = list(reader)
+
+        return datev_file
+
+
+class BookingsCSVReader:
+    """
+    Reads DATEV bookings files ("Buchungsstapel", e.g. written by `BookingsCSVFile`) row by row.
+    The header is parsed on creation; iterating over the reader yields the bookings as
+    `SparseRow`s, whose cells are typed by their column (see `COLUMN_TYPES`): amounts with a
+    fraction (like "1234,56") become Decimals, other numbers ints, and dates `datetime.date`s
+    (unless `parse_dates` is False). Other cells are strings; empty cells are None.
+
+    Column `i` of a row has the title `title_row[i]`, and corresponds to the `add_booking`
+    argument `BOOKING_FIELDS[i]`.
+
+    :param infd: The file's lines, e.g. a file opened with `newline=''` and the encoding the
+        DATEV file was written with.
+    :param parse_dates: Whether to parse dates. "Belegdatum" only contains day and month
+        ("DDMM"); its year is taken from the header's period, which is within a single year.
+    """
+
+    def __init__(self, infd: Iterable[str], parse_dates: bool = True):
+        self._reader = csv.reader(infd, delimiter=';', quotechar='"')
+
+        try:
+            header, self.title_row = next(self._reader), next(self._reader)
+        except StopIteration:
+            raise ValueError("The DATEV file lacks its header and title rows.") from None
+
+        if len(header) < 17 or header[0] not in ('EXTF', 'DTVF') or header[2] != '21':
+            raise ValueError("The file is not a DATEV bookings file (\"Buchungsstapel\").")
+
+        self.header: list = [int(cell) if i in _HEADER_NUMERIC_FIELDS and cell.isdigit() else cell
+                             for i, cell in enumerate(header)]
+        self.financial_year_start = _parse_datev_date(header[12])
+        self.start_date = _parse_datev_date(header[14])
+        self.end_date = _parse_datev_date(header[15])
+        self.title = header[16]
+
+        parse_date = lru_cache(maxsize=1024)(lambda cell: _parse_datev_date(cell, self.start_date.year))
+        parsers = {NUMERIC: _parse_datev_number, DATE: parse_date if parse_dates else str, TEXT: str}
+        self._parsers = [_parse_datev_decimal if title in _DECIMAL_COLUMNS else parsers[COLUMN_TYPES.get(title, TEXT)]
+                         for title in self.title_row]
+
+    @property
+    def line_num(self) -> int:
+        """The number of lines read so far."""
+        return self._reader.line_num
+
+    def __iter__(self) -> Iterator['SparseRow']:
+        parsers = self._parsers
+
+        for row in self._reader:
+            if len(row) > len(parsers):  # columns without a title are read as text
+                parsers.extend([str] * (len(row) - len(parsers)))
+
+            columns = tuple(compress(range(len(row)), row))  # the non-empty cells
+
+            try:
+                values = tuple([parsers[i](row[i]) for i in columns])
+            except (ValueError, ArithmeticError) as e:
+                raise ValueError(f"Invalid value in line {self.line_num} of the DATEV file: {e}") from None
+
+            yield SparseRow.from_layout((len(row), columns), values)
+
+
+# Header fields written as numbers (see `BookingsCSVFile.__init__`):
+_HEADER_NUMERIC_FIELDS = frozenset((1, 2, 4, 10, 11, 13, 18))
+
+# Numeric columns with decimal places, which are always read as Decimal (even for whole amounts like "100"):
+_DECIMAL_COLUMNS = frozenset((
+    'Umsatz (ohne Soll/Haben-Kz)', 'Kurs', 'Basis-Umsatz', 'Skonto', 'Kost-Menge', 'EU-Steuersatz', 'Gewicht',
+    'EU-Steuersatz (Anzahlungen)', 'Steuersatz',
+))
+
+
+def _parse_datev_number(cell: str) -> int | Decimal:
+    return Decimal(cell.replace(',', '.')) if ',' in cell else int(cell)
+
+
+def _parse_datev_decimal(cell: str) -> Decimal:
+    return Decimal(cell.replace(',', '.'))
+
+
+def _parse_datev_date(cell: str, year: int | None = None) -> datetime.date:
+    # Parses DATEV dates, i.e. "YYYYMMDD" in the header, and "DDMMYYYY" or "DDMM" (of `year`) in bookings
+    if len(cell) == 4 and year is not None:
+        return datetime.date(year, int(cell[2:]), int(cell[:2]))
+    elif len(cell) == 8 and year is not None:
+        return datetime.date(int(cell[4:]), int(cell[2:4]), int(cell[:2]))
+    elif len(cell) == 8:
+        return datetime.date(int(cell[:4]), int(cell[4:6]), int(cell[6:]))
+    raise ValueError(f"Invalid DATEV date \"{cell}\"")
+
 
 def datev_date(x: AnyDateRepresentation, short: bool = False) -> str:
     d = parse_any_date(x)
@@ -935,3 +1196,131 @@ def datev_date(x: AnyDateRepresentation, short: bool = False) -> str:
     else:
         return f'{d.year}{d.month:02}{d.day:02}'
 
+
+class SparseRow:
+    """
+    A read-only DATEV row that only stores its populated (non-None) cells. Booking rows
+    usually use about a dozen of their ~125 columns, so this saves most of the memory a
+    dense list would take. Rows populating the same columns share their layout tuple.
+
+    Iterating over a `SparseRow` yields all cells, including the empty ones (as None).
+    """
+
+    __slots__ = ('_layout', '_values')
+
+    def __init__(self, cells: Sequence[Any]):
+        columns = tuple(i for i, cell in enumerate(cells) if cell is not None)
+        layout = (len(cells), columns)
+
+        self._layout = _row_layouts.setdefault(layout, layout)
+        self._values = tuple(cells[i] for i in columns)
+
+    @classmethod
+    def from_cells(cls, length: int, cells: Mapping[int, Any]) -> 'SparseRow':
+        """
+        Create a row of `length` columns from its cells by column index; all other cells are empty.
+        """
+        columns = tuple(sorted(i for i, cell in cells.items() if cell is not None))
+        return cls.from_layout((length, columns), tuple(cells[i] for i in columns))
+
+    @classmethod
+    def from_layout(cls, layout: Tuple[int, Tuple[int, ...]], values: Tuple[Any, ...]) -> 'SparseRow':
+        """
+        Create a row from its layout (length and ascending populated column indices) and the
+        (non-None) values of the populated columns.
+        """
+        row = cls.__new__(cls)
+        row._layout = _row_layouts.setdefault(layout, layout)
+        row._values = values
+        return row
+
+    def __len__(self) -> int:
+        return self._layout[0]
+
+    @property
+    def columns(self) -> Tuple[int, ...]:
+        """The indices of the populated columns."""
+        return self._layout[1]
+
+    @property
+    def values(self) -> Tuple[Any, ...]:
+        """The values of the populated columns, in the order of `columns`."""
+        return self._values
+
+    def __iter__(self) -> Iterator[Any]:
+        length, columns = self._layout
+        position = 0
+        for i, value in zip(columns, self._values):
+            yield from repeat(None, i - position)
+            yield value
+            position = i + 1
+        yield from repeat(None, length - position)
+
+    def __getitem__(self, index: int) -> Any:
+        if not isinstance(index, int):  # slices
+            return self.to_list()[index]
+
+        length, columns = self._layout
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("row index out of range")
+
+        position = bisect_left(columns, index)
+        return self._values[position] if position < len(columns) and columns[position] == index else None
+
+    def __eq__(self, other: Any) -> bool:
+        # Rows compare equal to other rows and to lists with the same cells, like the dense rows did
+        if isinstance(other, SparseRow):
+            return self._layout == other._layout and self._values == other._values
+        if isinstance(other, list):
+            length, columns = self._layout
+            return (len(other) == length and all(other[i] == value for i, value in zip(columns, self._values))
+                    and sum(cell is not None for cell in other) == len(columns))  # all other cells are empty
+        return NotImplemented
+
+    __hash__ = None  # mutable lists are compared with rows, so rows aren't hashable either
+
+    def __repr__(self) -> str:
+        return f"SparseRow({self.to_list()!r})"
+
+    def to_list(self) -> list:
+        length, columns = self._layout
+        cells = [None] * length
+        for i, value in zip(columns, self._values):
+            cells[i] = value
+        return cells
+
+
+# Lookup tables for `BookingsCSVFile.add_bookings`:
+_booking_parameters = list(inspect.signature(BookingsCSVFile.add_booking).parameters.values())[1:]  # without `self`
+_BOOKING_PARAMETER_NAMES = tuple(parameter.name for parameter in _booking_parameters)
+_BOOKING_REQUIRED_PARAMETERS = frozenset(p.name for p in _booking_parameters if p.default is inspect.Parameter.empty)
+_BOOKING_DEFAULTS = {
+    p.name: p.default for p in _booking_parameters if p.default is not None and p.default is not inspect.Parameter.empty
+}
+_BOOKING_DEFAULTS[None] = ""  # field #103 (named None in `BOOKING_FIELDS`) is always written as an empty string
+_BOOKING_COLUMNS = {name: i for i, name in enumerate(BOOKING_FIELDS)}
+
+# Row layouts and value getters of bookings, by their field names (see `_compile_booking_plan`):
+_booking_plans: Dict[Tuple[str, ...], Tuple[Tuple[int, Tuple[int, ...]], Callable[[dict], Tuple[Any, ...]]]] = {}
+
+
+def _compile_booking_plan(fields: Tuple[str, ...], index: int):
+    """
+    Determine the row layout of bookings given with the field names `fields` (plus the fields
+    having defaults), and a getter returning their values in column order.
+    """
+
+    unknown = [name for name in fields if name not in _BOOKING_PARAMETER_NAMES]
+    if unknown:
+        raise TypeError(f"Booking {index + 1} has unknown field(s) {', '.join(f'`{name}`' for name in unknown)}.")
+
+    missing = [name for name in _BOOKING_PARAMETER_NAMES if name in _BOOKING_REQUIRED_PARAMETERS and name not in fields]
+    if missing:
+        raise TypeError(f"Booking {index + 1} lacks the required field(s) {', '.join(f'`{name}`' for name in missing)}.")
+
+    names = sorted({*fields, *_BOOKING_DEFAULTS}, key=_BOOKING_COLUMNS.__getitem__)
+    layout = (len(BOOKING_FIELDS), tuple(_BOOKING_COLUMNS[name] for name in names))
+
+    return _row_layouts.setdefault(layout, layout), itemgetter(*names)
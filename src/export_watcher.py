@@ -0,0 +1,143 @@
+import csv
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+# Removed from export file names to find the accounts export matching a transactions export,
+# e.g. "Example-Accounts.csv" and "Example-Transactions.csv":
+_EXPORT_KIND_PATTERN = re.compile(r'(account[-_ ]?tree|accounts?|transactions?|bookings?|konten|buchungen)', re.IGNORECASE)
+
+Signature = Tuple[int, int]  # modification time (ns) and size of a file
+
+
+@dataclass(frozen=True)
+class ExportPair:
+    key: str  # common part of both file names, lowercased
+    accounts_path: str
+    transactions_path: str
+
+
+class ExportWatcher:
+    """
+    Polls a folder for GnuCash CSV exports and reports the accounts/transactions export pairs that
+    changed since they were last converted. Changes are debounced: a pair is only reported once
+    none of its files changed for `debounce` seconds, so exports are not picked up while they are
+    still being written.
+
+    Exports are told apart by their number of columns (as in `ensure_correct_exports_order`) and
+    paired by their file names without words like "accounts" or "transactions". If the folder
+    contains only one export of each kind, they are paired regardless of their names.
+    """
+
+    def __init__(self, folder: str, debounce: float = 2.0, poll_interval: float = 1.0):
+        self.folder = folder
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+
+        self._signatures: Dict[str, Signature] = {}
+        self._changed_at: Dict[str, float] = {}  # files present on start count as settled
+        self._started = False
+        self._kinds: Dict[str, Tuple[Signature, str | None]] = {}  # cached export kind by path
+        self._converted: Dict[ExportPair, Tuple[Signature, Signature]] = {}
+
+    def poll(self) -> List[ExportPair]:
+        """
+        Scan the folder once and return the pairs that are ready to be (re)converted.
+        """
+
+        now = time.monotonic()
+        signatures = {}
+
+        for entry in os.scandir(self.folder):
+            if entry.is_file() and entry.name.lower().endswith('.csv'):
+                stat = entry.stat()
+                signatures[entry.path] = (stat.st_mtime_ns, stat.st_size)
+
+        for path, signature in signatures.items():
+            if path in self._signatures and self._signatures[path] != signature:
+                self._changed_at[path] = now
+            elif path not in self._signatures and self._started:  # added while watching
+                self._changed_at[path] = now
+
+        self._signatures = signatures
+        self._started = True
+
+        ready = []
+
+        for pair in self._pairs():
+            if any(now - self._changed_at.get(path, 0.0) < self.debounce
+                   for path in (pair.accounts_path, pair.transactions_path)):
+                continue  # still being written
+            if self._converted.get(pair) != self._pair_signature(pair):
+                ready.append(pair)
+
+        return ready
+
+    def wait(self) -> List[ExportPair]:
+        """
+        Block until at least one pair is ready to be (re)converted, and return the ready pairs.
+        """
+        while not (pairs := self.poll()):
+            time.sleep(self.poll_interval)
+        return pairs
+
+    def mark_converted(self, pair: ExportPair, signature: Tuple[Signature, Signature]):
+        """
+        Record that `pair` was converted while its files had the given signature (see `signature`).
+        """
+        self._converted[pair] = signature
+
+    def signature(self, pair: ExportPair) -> Tuple[Signature, Signature]:
+        """
+        Return the current signature of both files of `pair`; take it right before converting.
+        """
+        return tuple(self._stat(path) for path in (pair.accounts_path, pair.transactions_path))
+
+    def _pair_signature(self, pair: ExportPair) -> Tuple[Signature, Signature]:
+        return self._signatures[pair.accounts_path], self._signatures[pair.transactions_path]
+
+    def _pairs(self) -> List[ExportPair]:
+        accounts, transactions = {}, {}
+
+        for path in sorted(self._signatures):
+            kind = self._kind(path)
+            if kind:
+                key = _EXPORT_KIND_PATTERN.sub('', os.path.splitext(os.path.basename(path))[0])
+                key = re.sub(r'[-_ .]+', '-', key).strip('-').lower()
+                (accounts if kind == 'accounts' else transactions)[key] = path
+
+        if len(accounts) == 1 and len(transactions) == 1:
+            (key, accounts_path), (_, transactions_path) = accounts.popitem(), transactions.popitem()
+            return [ExportPair(key, accounts_path, transactions_path)]
+
+        return [ExportPair(key, accounts[key], transactions[key]) for key in accounts if key in transactions]
+
+    def _kind(self, path: str) -> str | None:
+        signature = self._signatures[path]
+        cached = self._kinds.get(path)
+
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        try:
+            with open(path, newline='') as f:
+                header = next(csv.reader(f), [])
+        except (OSError, UnicodeDecodeError, csv.Error):
+            header = []
+
+        # GnuCash's account tree exports have 12 columns, its transactions exports 18. DATEV files
+        # (e.g. when converting into the watched folder) start with "EXTF":
+        if len(header) < 2 or header[0] == 'EXTF':
+            kind = None
+        else:
+            kind = 'accounts' if len(header) < 15 else 'transactions'
+        self._kinds[path] = (signature, kind)
+
+        return kind
+
+    @staticmethod
+    def _stat(path: str) -> Signature:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,146 @@
+import abc
+import datetime
+import hashlib
+from decimal import Decimal
+from typing import Iterable, Iterator, List, Tuple
+
+from .gnucash_file import AccountsCSVFile, BookingsCSVFile, Booking
+from .utils import Periods
+
+
+class GnuCashBook(abc.ABC):
+    """
+    Source of the accounts and transactions of a GnuCash book, e.g. CSV exports of it or the book
+    file itself. This is what the converter reads from; subclasses implement the individual formats.
+    """
+
+    @abc.abstractmethod
+    def load_accounts(self) -> AccountsCSVFile:
+        """
+        Return the accounts of the book.
+        """
+
+    @abc.abstractmethod
+    def date_range(self) -> Tuple[datetime.date, datetime.date]:
+        """
+        Return the dates of the earliest and the latest transaction.
+        """
+
+    @abc.abstractmethod
+    def iter_transactions(self, start_date: datetime.date | None = None,
+                          end_date: datetime.date | None = None) -> Iterator[List[Booking]]:
+        """
+        Yield the splits of one transaction at a time. Books that can do so efficiently only
+        yield transactions between `start_date` and `end_date`; others may yield all of them.
+        """
+
+    @abc.abstractmethod
+    def fingerprint(self) -> str:
+        """
+        Return a content hash of the whole book.
+        """
+
+    def fingerprint_periods(self, periods: Periods) -> List[str]:
+        """
+        Return a content hash of the transactions within each of the given periods.
+        """
+
+        hashes = [hashlib.sha256() for _ in periods]
+
+        for splits in self.iter_transactions(periods[0][0], periods[-1][1]):
+            i = periods.index_of(splits[0].date)
+            if i is not None:
+                hashes[i].update(repr(splits).encode())
+
+        return [h.hexdigest() for h in hashes]
+
+    def close(self):
+        pass
+
+
+class CSVExportsBook(GnuCashBook):
+    """
+    A book given as GnuCash "Account Tree" and "Transactions" CSV exports. Exports that are read
+    more than once (e.g. to determine the date range first) need to be seekable; other iterables
+    are read into memory in that case.
+
+    :param group_memory_budget: Pass this for transactions exports in which the splits of a
+        transaction are not adjacent (see `BookingsCSVFile.iter_csv_export`).
+    :param accounts_file: The already parsed accounts export, e.g. kept from an earlier conversion.
+        It is then returned by `load_accounts` instead of parsing `accounts_export_fd` again.
+    """
+
+    def __init__(self, accounts_export_fd: Iterable[str], bookings_export_fd: Iterable[str],
+                 group_memory_budget: int | None = None, accounts_file: AccountsCSVFile | None = None):
+        self.accounts_export_fd = accounts_export_fd
+        self.bookings_export_fd = bookings_export_fd
+        self.group_memory_budget = group_memory_budget
+        self.accounts_file = accounts_file
+
+    def load_accounts(self) -> AccountsCSVFile:
+        if self.accounts_file is None:
+            self.accounts_file = AccountsCSVFile.load_csv_export(self.accounts_export_fd)
+        return self.accounts_file
+
+    def date_range(self) -> Tuple[datetime.date, datetime.date]:
+        return BookingsCSVFile.scan_date_range(self._rereadable_bookings_export())
+
+    def iter_transactions(self, start_date: datetime.date | None = None,
+                          end_date: datetime.date | None = None) -> Iterator[List[Booking]]:
+        return BookingsCSVFile.iter_csv_export(self.bookings_export_fd, group_memory_budget=self.group_memory_budget)
+
+    def fingerprint(self) -> str:
+        h = hashlib.sha256()
+
+        for export in (self._rereadable_accounts_export(), self._rereadable_bookings_export()):
+            pos = export.tell() if hasattr(export, 'seek') else None
+            for line in export:
+                h.update(line.encode())
+            if pos is not None:
+                export.seek(pos)
+            h.update(b'\0')
+
+        return h.hexdigest()
+
+    def fingerprint_periods(self, periods: Periods) -> List[str]:
+        return BookingsCSVFile.fingerprint_periods(self._rereadable_bookings_export(), periods)
+
+    def _rereadable_accounts_export(self) -> Iterable[str]:
+        if not hasattr(self.accounts_export_fd, 'seek'):
+            self.accounts_export_fd = list(self.accounts_export_fd)
+        return self.accounts_export_fd
+
+    def _rereadable_bookings_export(self) -> Iterable[str]:
+        if not hasattr(self.bookings_export_fd, 'seek'):
+            self.bookings_export_fd = list(self.bookings_export_fd)
+        return self.bookings_export_fd
+
+
+def gnc_numeric_to_decimal(num: int, denom: int) -> Decimal:
+    """
+    Convert an amount stored by GnuCash as fraction into a Decimal. GnuCash usually uses the
+    commodity's smallest unit (e.g. 1/100) as denominator; the implied number of decimal places
+    is kept, as in the CSV exports (e.g. "28.40").
+    """
+    if denom > 0 and 10 ** (len(str(denom)) - 1) == denom:
+        return Decimal(num).scaleb(1 - len(str(denom)))
+    return Decimal(num) / Decimal(denom)
+
+
+def open_gnucash_book(path: str) -> GnuCashBook:
+    """
+    Open a GnuCash book file, detecting its format from the file contents.
+    """
+
+    from .gnucash_sqlite import SQLiteBook, SQLITE_MAGIC
+    from .gnucash_xml import XMLBook, GZIP_MAGIC
+
+    with open(path, 'rb') as f:
+        magic = f.read(len(SQLITE_MAGIC))
+
+    if magic == SQLITE_MAGIC:
+        return SQLiteBook(path)
+    elif magic.startswith(GZIP_MAGIC) or magic.lstrip().startswith(b'<'):
+        return XMLBook(path)
+
+    raise ValueError(f"\"{path}\" is not a GnuCash book in a supported format (SQLite or XML).")
@@ -1,10 +1,19 @@
 import csv
+import hashlib
 from decimal import Decimal
 from dataclasses import dataclass
 import datetime
-from typing import Iterable, List, T
+import sys
+from collections import deque
+from itertools import groupby
+from operator import attrgetter
+from typing import Iterable, Iterator, List, Dict, Tuple, T
 
-from .utils import parse_any_date
+from .split_grouping import group_splits
+from .utils import DateParser, Periods
+
+# Number of preceding transactions checked for non-adjacent splits by `iter_csv_export`:
+ADJACENCY_CHECK_WINDOW = 10000
 
 
 class BookingsCSVFile:
@@ -17,35 +26,120 @@ class BookingsCSVFile:
         self.rows: List[Booking] = []
 
     @classmethod
-    def load_csv_export(cls, infd: Iterable[str]) -> 'BookingsCSVFile':
+    def load_csv_export(cls, infd: Iterable[str], intern_strings: bool = True) -> 'BookingsCSVFile':
+        """
+        Parse a GnuCash transactions CSV export.
+
+        :param intern_strings: Whether to share repeated values between bookings: Account names and
+            currencies are interned, and the splits of a transaction share their transaction-level
+            fields (date, description, …). This considerably reduces the memory used per booking.
+        """
+
         reader = csv.reader(infd)
 
         file = cls()
         file.header = next(reader)
+        file.rows.extend(_parse_booking_rows(reader, intern_strings))
+
+        return file
+
+    @staticmethod
+    def iter_csv_export(infd: Iterable[str], intern_strings: bool = True,
+                        group_memory_budget: int | None = None) -> Iterator[List['Booking']]:
+        """
+        Lazily parse a GnuCash transactions CSV export, yielding the splits of one transaction
+        at a time. In contrast to `load_csv_export`, only the current transaction (plus the IDs
+        of the last `ADJACENCY_CHECK_WINDOW` transactions) is kept in memory.
+
+        :param group_memory_budget: By default, the splits of a transaction are expected to be
+            adjacent in the export, which is the case for files exported by GnuCash; a ValueError
+            is raised if splits of a transaction reappear within the next `ADJACENCY_CHECK_WINDOW`
+            transactions, or if the values of a transaction's adjacent splits don't add up to
+            zero (which catches splits reappearing later on). For exports in any other order (e.g.
+            re-sorted or concatenated ones), pass the number of bytes that may be used to group
+            the splits instead (see `split_grouping.group_splits`).
+        """
+
+        reader = csv.reader(infd)
+
+        if next(reader, None) is None:  # skip the header
+            return
+
+        bookings = _parse_booking_rows(reader, intern_strings)
+
+        if group_memory_budget is not None:
+            yield from group_splits(bookings, group_memory_budget)
+            return
+
+        # The IDs of the most recently read transactions, to detect splits that are not adjacent:
+        recent_transactions = set()
+        recent_order = deque()
+
+        for transaction_id, group in groupby(bookings, key=attrgetter('transaction_id')):
+            splits = list(group)
+
+            # Balanced transactions only consist of a part of their splits if the splits are not adjacent:
+            if transaction_id in recent_transactions or sum(split.value_num for split in splits):
+                raise ValueError(f"The splits of transaction \"{transaction_id}\" are not adjacent in the transactions "
+                                 f"export, e.g. because it was re-sorted or concatenated from several exports. Pass "
+                                 f"`group_memory_budget` (--unsorted-exports on the command line) to convert it anyway.")
+
+            recent_transactions.add(transaction_id)
+            recent_order.append(transaction_id)
+            if len(recent_order) > ADJACENCY_CHECK_WINDOW:
+                recent_transactions.discard(recent_order.popleft())
+
+            yield splits
+
+    @staticmethod
+    def scan_date_range(infd: Iterable[str]) -> Tuple[datetime.date, datetime.date]:
+        """
+        Determine the earliest and the latest booking date of a GnuCash transactions CSV export
+        without constructing any `Booking` objects. If `infd` is seekable, it is rewound to its
+        initial position afterwards, so it can be parsed again.
+        """
+
+        pos = infd.tell() if hasattr(infd, 'seek') else None
+        reader = csv.reader(infd)
+        next(reader, None)  # skip the header
+
+        dates = {row[0] for row in reader}
+
+        if pos is not None:
+            infd.seek(pos)
+
+        if not dates:
+            raise ValueError("The transactions export does not contain any bookings.")
+
+        parse_date = DateParser().parse
+        parsed_dates = [parse_date(d) for d in dates]
+        return min(parsed_dates), max(parsed_dates)
+
+    @staticmethod
+    def fingerprint_periods(infd: Iterable[str], periods: Periods) -> List[str]:
+        """
+        Compute a content hash of the raw export rows falling into each of the given periods,
+        without constructing any `Booking` objects. If `infd` is seekable, it is rewound to its
+        initial position afterwards, so it can be parsed again.
+        """
+
+        pos = infd.tell() if hasattr(infd, 'seek') else None
+        reader = csv.reader(infd)
+        next(reader, None)  # skip the header
+
+        parse_date = DateParser().parse
+        hashes = [hashlib.sha256() for _ in periods]
 
         for row in reader:
-            file.rows.append(Booking(
-                date=parse_any_date(row[0]),
-                transaction_id=row[1],
-                number=row[2],
-                description=row[3],
-                notes=row[4],
-                commodity_currency=row[5],
-                void_reason=row[6],
-                action=row[7],
-                memo=row[8],
-                full_account_name=row[9],
-                account_name=row[10],
-                amount_with_sym=row[11],
-                amount_num=Decimal(row[12].replace(",", "")),
-                value_with_sym=row[13],
-                value_num=Decimal(row[14].replace(",", "")),
-                reconcile=row[15],
-                reconcile_date=parse_any_date(row[16]) if row[16].strip() else None,
-                rate_price=row[17],
-            ))
+            i = periods.index_of(parse_date(row[0]))
+            if i is not None:
+                hashes[i].update("\x1f".join(row).encode())
+                hashes[i].update(b"\x1e")
 
-        return file
+        if pos is not None:
+            infd.seek(pos)
+
+        return [h.hexdigest() for h in hashes]
 
 
 class AccountsCSVFile:
@@ -56,6 +150,11 @@ class AccountsCSVFile:
         ]
         self.rows: List[Account] = []
 
+        # Lookup indices, kept in sync with `self.rows` (see `add_account`):
+        self._accounts_by_full_name: Dict[str, Account] = {}
+        self._accounts_by_code: Dict[str, Account] = {}
+        self._indexed_rows_count = 0
+
     @classmethod
     def load_csv_export(cls, infd: Iterable[str]) -> 'AccountsCSVFile':
         reader = csv.reader(infd)
@@ -64,7 +163,7 @@ class AccountsCSVFile:
         file.header = next(reader)
 
         for row in reader:
-            file.rows.append(Account(
+            file.add_account(Account(
                 type_=row[0],
                 full_account_name=row[1],
                 account_name=row[2],
@@ -81,14 +180,79 @@ class AccountsCSVFile:
 
         return file
 
+    def add_account(self, account: 'Account'):
+        self._ensure_index()
+        self.rows.append(account)
+        self._index_account(account)
+
     def get_account_by_full_name(self, full_name: str, default: T = None) -> T | 'Account':
-        return next(filter(
-            lambda a: a.full_account_name == full_name,
-            self.rows
-        ), None)
+        self._ensure_index()
+        return self._accounts_by_full_name.get(full_name, default)
+
+    def get_account_by_code(self, account_code: str, default: T = None) -> T | 'Account':
+        self._ensure_index()
+        return self._accounts_by_code.get(account_code, default)
+
+    def _index_account(self, account: 'Account'):
+        # The first account wins on duplicates, matching the former linear search:
+        self._accounts_by_full_name.setdefault(account.full_account_name, account)
+        if account.account_code:
+            self._accounts_by_code.setdefault(account.account_code, account)
+        self._indexed_rows_count += 1
+
+    def _ensure_index(self):
+        # Rebuild the indices if `self.rows` was modified directly instead of via `add_account`:
+        if self._indexed_rows_count != len(self.rows):
+            self._accounts_by_full_name.clear()
+            self._accounts_by_code.clear()
+            self._indexed_rows_count = 0
+            for account in self.rows:
+                self._index_account(account)
+
+
+def _parse_booking_rows(rows: Iterable[List[str]], intern_strings: bool = True) -> Iterator['Booking']:
+    intern = sys.intern if intern_strings else str
+    parse_date, parse_reconcile_date = DateParser().parse, DateParser().parse
+    prev, prev_date_string = None, None
+
+    for row in rows:
+        if intern_strings and prev is not None and row[1] == prev.transaction_id and row[0] == prev_date_string:
+            # All splits of a transaction share the transaction-level fields, so reuse the objects:
+            date, transaction_id, number, description, notes, commodity_currency, void_reason = (
+                prev.date, prev.transaction_id, prev.number, prev.description, prev.notes,
+                prev.commodity_currency, prev.void_reason,
+            )
+        else:
+            date, transaction_id, number, description, notes = parse_date(row[0]), row[1], row[2], row[3], row[4]
+            commodity_currency, void_reason = intern(row[5]), row[6]
+            prev_date_string = row[0]
+
+        amount_num = Decimal(row[12].replace(",", ""))
+
+        prev = Booking(
+            date=date,
+            transaction_id=transaction_id,
+            number=number,
+            description=description,
+            notes=notes,
+            commodity_currency=commodity_currency,
+            void_reason=void_reason,
+            action=row[7],
+            memo=row[8],
+            full_account_name=intern(row[9]),
+            account_name=intern(row[10]),
+            amount_with_sym=row[11],
+            amount_num=amount_num,
+            value_with_sym=row[11] if row[13] == row[11] else row[13],
+            value_num=amount_num if row[14] == row[12] else Decimal(row[14].replace(",", "")),
+            reconcile=intern(row[15]),
+            reconcile_date=parse_reconcile_date(row[16]) if row[16].strip() else None,
+            rate_price=intern(row[17]),
+        )
+        yield prev
 
 
-@dataclass
+@dataclass(slots=True)
 class Booking:
     date: datetime.date  # Date of the financial transaction.
     transaction_id: str  # Unique ID for the transaction.
@@ -110,7 +274,7 @@ class Booking:
     rate_price: str  # Rate or price associated with the transaction.
 
 
-@dataclass
+@dataclass(slots=True)
 class Account:
     type_: str  # Type of the account.
     full_account_name: str  # Full account name.
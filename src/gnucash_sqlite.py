@@ -0,0 +1,204 @@
+import datetime
+import hashlib
+import pathlib
+import sqlite3
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple
+
+from .gnucash_book import GnuCashBook, gnc_numeric_to_decimal
+from .gnucash_file import AccountsCSVFile, Account, Booking
+
+SQLITE_MAGIC = b'SQLite format 3\0'
+
+
+class SQLiteBook(GnuCashBook):
+    """
+    A GnuCash book stored in the SQLite format, read directly from its `accounts`, `transactions`
+    and `splits` tables. Transactions are queried by date range using GnuCash's index on
+    `transactions.post_date`, so converting a short period doesn't need to read the whole book.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(pathlib.Path(path).absolute().as_uri() + '?mode=ro', uri=True)
+        self._accounts: Dict[str, Account] | None = None
+
+        # GnuCash 2.6 stored dates as "YYYYMMDDHHMMSS", newer versions use "YYYY-MM-DD HH:MM:SS":
+        row = self.connection.execute("SELECT post_date FROM transactions LIMIT 1").fetchone()
+        self._date_format = '%Y%m%d%H%M%S' if row and row[0] and '-' not in row[0] else '%Y-%m-%d %H:%M:%S'
+        self._parse_date = lru_cache(maxsize=4096)(self._parse_date)  # dates tend to repeat a lot
+
+    def close(self):
+        self.connection.close()
+
+    def load_accounts(self) -> AccountsCSVFile:
+        file = AccountsCSVFile()
+        for account in self._load_accounts().values():
+            file.add_account(account)
+        return file
+
+    def date_range(self) -> Tuple[datetime.date, datetime.date]:
+        # Only transactions posting to the book's accounts count, like in `iter_transactions` (thus
+        # e.g. not the templates of scheduled transactions, whose accounts are below another root):
+        first, last = self.connection.execute("""
+            WITH RECURSIVE book_accounts(guid) AS (
+                SELECT guid FROM accounts WHERE parent_guid = (SELECT root_account_guid FROM books LIMIT 1)
+                UNION ALL
+                SELECT a.guid FROM accounts a JOIN book_accounts b ON a.parent_guid = b.guid
+            )
+            SELECT MIN(post_date), MAX(post_date) FROM transactions
+            WHERE guid IN (SELECT tx_guid FROM splits WHERE account_guid IN book_accounts)
+        """).fetchone()
+        if first is None:
+            raise ValueError("The GnuCash book does not contain any transactions.")
+        return self._parse_date(first), self._parse_date(last)
+
+    def iter_transactions(self, start_date: datetime.date | None = None,
+                          end_date: datetime.date | None = None) -> Iterator[List[Booking]]:
+        accounts = self._load_accounts()
+        commodities = self._load_commodities()
+
+        conditions, params = [], []
+        if start_date:
+            conditions.append("t.post_date >= ?")
+            params.append(self._format_date(start_date))
+        if end_date:
+            conditions.append("t.post_date < ?")
+            params.append(self._format_date(end_date + datetime.timedelta(days=1)))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        transaction_slots = self._load_slots(
+            f"SELECT t.guid FROM transactions t {where}", params, names=('notes', 'void-reason'))
+
+        cursor = self.connection.execute(f"""
+            SELECT t.guid, t.post_date, t.num, t.description, t.currency_guid, s.account_guid, s.memo, s.action,
+                   s.reconcile_state, s.reconcile_date, s.value_num, s.value_denom, s.quantity_num, s.quantity_denom
+            FROM transactions t JOIN splits s ON s.tx_guid = t.guid
+            {where}
+            ORDER BY t.post_date, t.guid, s.rowid
+        """, params)
+
+        splits: List[Booking] = []
+
+        for (transaction_id, post_date, number, description, currency_guid, account_guid, memo, action,
+             reconcile_state, reconcile_date, value_num, value_denom, quantity_num, quantity_denom) in cursor:
+            if splits and splits[0].transaction_id != transaction_id:
+                yield splits
+                splits = []
+
+            account = accounts.get(account_guid)
+            if account is None:  # e.g. splits of scheduled transaction templates
+                continue
+
+            if splits:  # share the transaction-level fields between splits
+                first = splits[0]
+                date, description, currency = first.date, first.description, first.commodity_currency
+            else:
+                date = self._parse_date(post_date)
+                currency = '::'.join(commodities.get(currency_guid, ('', '')))
+
+            amount = gnc_numeric_to_decimal(quantity_num, quantity_denom)
+            value = gnc_numeric_to_decimal(value_num, value_denom)
+            symbol = account.symbol
+
+            splits.append(Booking(
+                date=date,
+                transaction_id=transaction_id,
+                number=number or '',
+                description=description or '',
+                notes=transaction_slots.get((transaction_id, 'notes'), ''),
+                commodity_currency=currency,
+                void_reason=transaction_slots.get((transaction_id, 'void-reason'), ''),
+                action=action or '',
+                memo=memo or '',
+                full_account_name=account.full_account_name,
+                account_name=account.account_name,
+                amount_with_sym=f"{amount:,} {symbol}",
+                amount_num=amount,
+                value_with_sym=f"{value:,} {currency.rpartition('::')[2]}",
+                value_num=value,
+                reconcile=reconcile_state or '',
+                reconcile_date=self._parse_date(reconcile_date) if reconcile_date and reconcile_state != 'n' else None,
+                rate_price=str(value / amount) if amount else '',
+            ))
+
+        if splits:
+            yield splits
+
+    def fingerprint(self) -> str:
+        h = hashlib.sha256()
+        with open(self.path, 'rb') as f:
+            while chunk := f.read(1 << 20):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _load_accounts(self) -> Dict[str, Account]:
+        # Accounts by their GUID, limited to the descendants of the book's root account
+        if self._accounts is not None:
+            return self._accounts
+
+        commodities = self._load_commodities()
+        root_guid = self.connection.execute("SELECT root_account_guid FROM books LIMIT 1").fetchone()[0]
+        rows = {row[0]: row for row in self.connection.execute(
+            "SELECT guid, name, account_type, commodity_guid, parent_guid, code, description, hidden, placeholder "
+            "FROM accounts")}
+        slots = self._load_slots("SELECT guid FROM accounts", (), names=('notes', 'color', 'tax-related'))
+
+        full_names = {root_guid: None}
+
+        def full_name(guid: str) -> str | None:  # None for accounts not below the root account
+            if guid not in full_names:
+                parent_guid = rows[guid][4]
+                parent_name = full_name(parent_guid) if parent_guid in rows else None
+                if parent_guid == root_guid:
+                    full_names[guid] = rows[guid][1]
+                else:
+                    full_names[guid] = f"{parent_name}:{rows[guid][1]}" if parent_name else None
+            return full_names[guid]
+
+        self._accounts = {}
+
+        for guid, name, account_type, commodity_guid, _, code, description, hidden, placeholder in rows.values():
+            if guid == root_guid or not full_name(guid):
+                continue
+
+            namespace, symbol = commodities.get(commodity_guid, ('', ''))
+            self._accounts[guid] = Account(
+                type_=account_type,
+                full_account_name=full_names[guid],
+                account_name=name,
+                account_code=code or '',
+                description=description or '',
+                account_color=slots.get((guid, 'color'), ''),
+                notes=slots.get((guid, 'notes'), ''),
+                symbol=symbol,
+                namespace=namespace,
+                hidden='T' if hidden else 'F',
+                tax_info='T' if slots.get((guid, 'tax-related')) else 'F',
+                placeholder='T' if placeholder else 'F',
+            )
+
+        return self._accounts
+
+    def _load_commodities(self) -> Dict[str, Tuple[str, str]]:
+        return {guid: (namespace, mnemonic) for guid, namespace, mnemonic in self.connection.execute(
+            "SELECT guid, namespace, mnemonic FROM commodities")}
+
+    def _load_slots(self, guids_query: str, params, names: Tuple[str, ...]) -> Dict[Tuple[str, str], str | int]:
+        query = (f"SELECT obj_guid, name, string_val, int64_val FROM slots "
+                 f"WHERE name IN ({', '.join('?' * len(names))}) AND obj_guid IN ({guids_query})")
+        return {(guid, name): string_val if string_val is not None else int64_val
+                for guid, name, string_val, int64_val in self.connection.execute(query, (*names, *params))}
+
+    # GnuCash stores points in time in UTC, while dates are meant in local time: older versions
+    # stored local midnight (e.g. "2019-12-31 23:00:00" for January 1 in CET), newer ones 10:59 UTC.
+    # Like GnuCash, convert them to local time before taking the date:
+    def _parse_date(self, value: str) -> datetime.date:
+        utc = datetime.datetime.strptime(value, self._date_format).replace(tzinfo=datetime.timezone.utc)
+        return utc.astimezone().date()
+
+    def _format_date(self, date: datetime.date) -> str:
+        # The start of `date` in local time, as stored by GnuCash
+        local_midnight = datetime.datetime.combine(date, datetime.time()).astimezone()
+        return local_midnight.astimezone(datetime.timezone.utc).strftime(self._date_format)
+
@@ -0,0 +1,216 @@
+import datetime
+import gzip
+import hashlib
+import xml.etree.ElementTree as ET
+from decimal import Decimal
+from typing import BinaryIO, Dict, Iterator, List, Tuple
+
+from .gnucash_book import GnuCashBook, gnc_numeric_to_decimal
+from .gnucash_file import AccountsCSVFile, Account, Booking
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+_GNC, _ACT, _TRN, _SPLIT, _CMDTY, _SLOT, _TS = (
+    f"{{http://www.gnucash.org/XML/{prefix}}}" for prefix in ('gnc', 'act', 'trn', 'split', 'cmdty', 'slot', 'ts')
+)
+
+_BOOK_TAG = _GNC + 'book'
+_ACCOUNT_TAG = _GNC + 'account'
+_TRANSACTION_TAG = _GNC + 'transaction'
+
+
+class XMLBook(GnuCashBook):
+    """
+    A GnuCash book stored in the (usually gzip-compressed) XML format. The file is parsed
+    incrementally and each account and transaction element is discarded once it has been
+    converted, so memory usage doesn't grow with the number of transactions.
+
+    Since the XML format has no index, every pass over the transactions reads the whole file;
+    transactions outside of the requested dates are skipped without converting them, though.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._accounts: Dict[str, Account] | None = None
+
+    def load_accounts(self) -> AccountsCSVFile:
+        file = AccountsCSVFile()
+        for account in self._load_accounts().values():
+            file.add_account(account)
+        return file
+
+    def date_range(self) -> Tuple[datetime.date, datetime.date]:
+        first_date = last_date = None
+
+        for tag, element in self._iter_book_elements():
+            if tag == _TRANSACTION_TAG:
+                date = _parse_date(element.findtext(f'{_TRN}date-posted/{_TS}date'))
+                first_date = min(first_date or date, date)
+                last_date = max(last_date or date, date)
+
+        if first_date is None:
+            raise ValueError("The GnuCash book does not contain any transactions.")
+
+        return first_date, last_date
+
+    def iter_transactions(self, start_date: datetime.date | None = None,
+                          end_date: datetime.date | None = None) -> Iterator[List[Booking]]:
+        accounts = self._load_accounts()
+
+        for tag, element in self._iter_book_elements():
+            if tag != _TRANSACTION_TAG:
+                continue
+
+            date = _parse_date(element.findtext(f'{_TRN}date-posted/{_TS}date'))
+            if (start_date and date < start_date) or (end_date and date > end_date):
+                continue
+
+            transaction_id = element.findtext(f'{_TRN}id')
+            number = element.findtext(f'{_TRN}num') or ''
+            description = element.findtext(f'{_TRN}description') or ''
+            currency_symbol = element.findtext(f'{_TRN}currency/{_CMDTY}id') or ''
+            currency = f"{element.findtext(f'{_TRN}currency/{_CMDTY}space') or ''}::{currency_symbol}"
+            slots = _parse_slots(element.find(f'{_TRN}slots'))
+
+            splits = []
+
+            for split in element.iterfind(f'{_TRN}splits/{_TRN}split'):
+                account = accounts.get(split.findtext(f'{_SPLIT}account'))
+                if account is None:
+                    continue
+
+                amount = _parse_numeric(split.findtext(f'{_SPLIT}quantity'))
+                value = _parse_numeric(split.findtext(f'{_SPLIT}value'))
+                reconcile = split.findtext(f'{_SPLIT}reconciled-state') or ''
+                reconcile_date = split.findtext(f'{_SPLIT}reconcile-date/{_TS}date')
+
+                splits.append(Booking(
+                    date=date,
+                    transaction_id=transaction_id,
+                    number=number,
+                    description=description,
+                    notes=slots.get('notes', ''),
+                    commodity_currency=currency,
+                    void_reason=slots.get('void-reason', ''),
+                    action=split.findtext(f'{_SPLIT}action') or '',
+                    memo=split.findtext(f'{_SPLIT}memo') or '',
+                    full_account_name=account.full_account_name,
+                    account_name=account.account_name,
+                    amount_with_sym=f"{amount:,} {account.symbol}",
+                    amount_num=amount,
+                    value_with_sym=f"{value:,} {currency_symbol}",
+                    value_num=value,
+                    reconcile=reconcile,
+                    reconcile_date=_parse_date(reconcile_date) if reconcile_date and reconcile != 'n' else None,
+                    rate_price=str(value / amount) if amount else '',
+                ))
+
+            if splits:
+                yield splits
+
+    def fingerprint(self) -> str:
+        h = hashlib.sha256()
+        with open(self.path, 'rb') as f:
+            while chunk := f.read(1 << 20):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _load_accounts(self) -> Dict[str, Account]:
+        # Accounts by their GUID, excluding the root account. GnuCash writes all accounts before
+        # the first transaction, so the rest of the file does not need to be read here.
+        if self._accounts is not None:
+            return self._accounts
+
+        elements = {}  # account fields by GUID, in file order (i.e. parents first)
+
+        for tag, element in self._iter_book_elements():
+            if tag == _TRANSACTION_TAG:
+                break
+            if tag != _ACCOUNT_TAG:
+                continue
+
+            elements[element.findtext(f'{_ACT}id')] = (
+                element.findtext(f'{_ACT}name') or '',
+                element.findtext(f'{_ACT}type'),
+                element.findtext(f'{_ACT}parent'),
+                element.findtext(f'{_ACT}code') or '',
+                element.findtext(f'{_ACT}description') or '',
+                element.findtext(f'{_ACT}commodity/{_CMDTY}space') or '',
+                element.findtext(f'{_ACT}commodity/{_CMDTY}id') or '',
+                _parse_slots(element.find(f'{_ACT}slots')),
+            )
+
+        full_names = {}
+        self._accounts = {}
+
+        for guid, (name, type_, parent_guid, code, description, namespace, symbol, slots) in elements.items():
+            if type_ == 'ROOT':
+                continue
+
+            parent_name = full_names.get(parent_guid)
+            full_names[guid] = f"{parent_name}:{name}" if parent_name else name
+
+            self._accounts[guid] = Account(
+                type_=type_,
+                full_account_name=full_names[guid],
+                account_name=name,
+                account_code=code,
+                description=description,
+                account_color=slots.get('color', ''),
+                notes=slots.get('notes', ''),
+                symbol=symbol,
+                namespace=namespace,
+                hidden='T' if slots.get('hidden') == 'true' else 'F',
+                tax_info='T' if slots.get('tax-related') not in (None, '0') else 'F',
+                placeholder='T' if slots.get('placeholder') == 'true' else 'F',
+            )
+
+        return self._accounts
+
+    def _iter_book_elements(self) -> Iterator[Tuple[str, ET.Element]]:
+        """
+        Yield the tag and the element of each direct child of the book element (e.g. accounts
+        and transactions) once it has been parsed completely. Elements are cleared afterwards,
+        so they must not be kept. Nested books, such as the template transactions of scheduled
+        transactions, are skipped.
+        """
+
+        with self._open() as f:
+            depth = 0
+            book = None
+
+            for event, element in ET.iterparse(f, events=('start', 'end')):
+                if event == 'start':
+                    depth += 1
+                    if depth == 2 and element.tag == _BOOK_TAG:
+                        book = element
+                    continue
+
+                depth -= 1
+
+                if book is not None and depth == 2:
+                    yield element.tag, element
+                    book.clear()  # releases the consumed element
+
+    def _open(self) -> BinaryIO:
+        with open(self.path, 'rb') as f:
+            magic = f.read(len(GZIP_MAGIC))
+        return gzip.open(self.path, 'rb') if magic == GZIP_MAGIC else open(self.path, 'rb')
+
+
+def _parse_slots(element: ET.Element | None) -> Dict[str, str]:
+    # Only the top-level key-value pairs; frames (nested slots) are ignored
+    if element is None:
+        return {}
+    return {slot.findtext(f'{_SLOT}key'): slot.findtext(f'{_SLOT}value') or ''
+            for slot in element.iterfind('slot')}
+
+
+def _parse_numeric(text: str) -> Decimal:
+    num, _, denom = text.partition('/')
+    return gnc_numeric_to_decimal(int(num), int(denom or 1))
+
+
+def _parse_date(text: str) -> datetime.date:
+    # e.g. "2023-03-07 10:59:00 +0000"; the date is the one shown in GnuCash
+    return datetime.date.fromisoformat(text.strip()[:10])
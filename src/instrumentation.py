@@ -0,0 +1,115 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, TypeVar
+
+T = TypeVar('T')
+
+
+class Stage:
+    """
+    Timing and row/byte counts of one stage of a conversion (e.g. loading the bookings or writing
+    a DATEV file). A stage can be entered as context manager many times; the time spent in all
+    `with stage:` blocks is summed up.
+    """
+
+    __slots__ = ('name', 'period', 'seconds', 'rows', 'bytes', '_start')
+
+    def __init__(self, name: str, period: int | None = None):
+        self.name = name
+        self.period = period  # index of the period the stage belongs to, if any
+        self.seconds = 0.0
+        self.rows = 0
+        self.bytes = 0
+
+    def __enter__(self) -> 'Stage':
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.seconds += time.perf_counter() - self._start
+
+    def __getstate__(self):  # allows sending stages back from worker processes
+        return self.name, self.period, self.seconds, self.rows, self.bytes
+
+    def __setstate__(self, state):
+        self.name, self.period, self.seconds, self.rows, self.bytes = state
+
+    def __repr__(self) -> str:
+        return (f"Stage(name={self.name!r}, period={self.period!r}, seconds={self.seconds:.6f}, "
+                f"rows={self.rows}, bytes={self.bytes})")
+
+
+class Instrumentation:
+    """
+    Collects the stages of a conversion as they finish and passes each of them to `callback`.
+    Pass an instance to `convert_gnucash_to_datev` to find out where the time is spent.
+    """
+
+    def __init__(self, callback: Callable[[Stage], None] | None = None):
+        self.callback = callback
+        self.stages: List[Stage] = []
+
+    def report(self, stage: Stage):
+        self.stages.append(stage)
+        if self.callback:
+            self.callback(stage)
+
+    @contextmanager
+    def measure(self, name: str, period: int | None = None) -> Iterator[Stage]:
+        """
+        Time the enclosed block as a stage of its own and report it afterwards.
+        """
+        stage = Stage(name, period)
+        with stage:
+            yield stage
+        self.report(stage)
+
+    @staticmethod
+    def timed(stage: Stage, iterable: Iterable[T]) -> Iterator[T]:
+        """
+        Iterate over `iterable`, adding the time spent producing its items and their count to `stage`.
+        """
+        iterator = iter(iterable)
+        while True:
+            with stage:
+                item = next(iterator, stage)  # the stage itself serves as sentinel
+            if item is stage:
+                return
+            stage.rows += 1
+            yield item
+
+    def summary(self) -> Dict[str, Stage]:
+        """
+        Return the reported stages aggregated by name, in the order they were first reported.
+        """
+        totals = {}
+        for stage in self.stages:
+            total = totals.setdefault(stage.name, Stage(stage.name))
+            total.seconds += stage.seconds
+            total.rows += stage.rows
+            total.bytes += stage.bytes
+        return totals
+
+    def format_table(self) -> str:
+        lines = [f"{'Stage':<16} {'Seconds':>10} {'Rows':>10} {'Rows/s':>12} {'Bytes':>12}"]
+        for total in self.summary().values():
+            rows_per_second = f"{total.rows / total.seconds:.0f}" if total.rows and total.seconds else ""
+            lines.append(f"{total.name:<16} {total.seconds:>10.3f} {total.rows or '':>10} {rows_per_second:>12} "
+                         f"{total.bytes or '':>12}")
+        return "\n".join(lines)
+
+
+class TimedWriter:
+    """
+    Wraps a writeable, adding the time spent in its `write` method and the written size to `stage`.
+    """
+
+    def __init__(self, outfd: 'SupportsWrite[bytes]', stage: Stage):
+        self.outfd = outfd
+        self.stage = stage
+
+    def write(self, data: bytes) -> int:
+        with self.stage:
+            written = self.outfd.write(data)
+        self.stage.bytes += len(data)
+        return written
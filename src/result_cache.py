@@ -0,0 +1,117 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Any, Iterable, List
+
+CACHE_VERSION = 2  # increase whenever the generated DATEV files change for the same inputs
+
+DEFAULT_MAX_SIZE = 1 << 30  # 1 GiB
+
+
+class ResultCache:
+    """
+    On-disk cache of generated DATEV files, keyed on the contents of the GnuCash book (or its exports)
+    and the conversion parameters. Each entry is a folder containing the DATEV files of one conversion.
+    When the cache grows beyond `max_size` bytes, the least recently used entries are evicted.
+
+    :param hardlink: Serve cache hits by hard-linking the cached files into the output folder
+        instead of copying them. Note that modifying hard-linked files in place also modifies the
+        cache entry.
+    """
+
+    def __init__(self, directory: str, max_size: int = DEFAULT_MAX_SIZE, hardlink: bool = False):
+        self.directory = directory
+        self.max_size = max_size
+        self.hardlink = hardlink
+
+    @staticmethod
+    def key(book_fingerprint: str, *params: Any) -> str:
+        """
+        Compute the cache key of a conversion from the fingerprint of the converted book (see
+        `GnuCashBook.fingerprint`) and the conversion parameters.
+        """
+
+        h = hashlib.sha256(f"gnutev-cache-{CACHE_VERSION}".encode())
+        h.update(book_fingerprint.encode())
+        h.update(b'\0')
+        h.update(repr(params).encode())
+
+        return h.hexdigest()
+
+    def restore(self, key: str, output_dir: str) -> List[str] | None:
+        """
+        Place the cached files of entry `key` into `output_dir`. Returns the paths of the restored
+        files, or None if the cache does not contain the entry.
+        """
+
+        entry = os.path.join(self.directory, key)
+
+        try:
+            names = sorted(os.listdir(entry))
+        except FileNotFoundError:
+            return None
+
+        paths = []
+
+        for name in names:
+            fn = os.path.join(output_dir, name)
+            if os.path.lexists(fn):
+                os.remove(fn)
+            self._place(os.path.join(entry, name), fn, self.hardlink)
+            paths.append(fn)
+
+        os.utime(entry)  # mark the entry as recently used
+
+        return paths
+
+    def store(self, key: str, filenames: Iterable[str]):
+        """
+        Add the given generated files to the cache as entry `key`, then evict the least recently
+        used entries if the cache exceeds its maximum size.
+        """
+
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_entry = tempfile.mkdtemp(prefix='.tmp-', dir=self.directory)
+
+        for fn in filenames:
+            self._place(fn, os.path.join(tmp_entry, os.path.basename(fn)), hardlink=False)
+
+        try:
+            os.replace(tmp_entry, os.path.join(self.directory, key))
+        except OSError:  # the entry was added concurrently
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits into `max_size`.
+        """
+
+        entries = []
+
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith('.') or not os.path.isdir(path):
+                continue
+            size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            entries.append((os.path.getmtime(path), size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+
+        for _, size, path in sorted(entries):  # oldest first
+            if total_size <= self.max_size:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total_size -= size
+
+    @staticmethod
+    def _place(src: str, dst: str, hardlink: bool):
+        if hardlink:
+            try:
+                os.link(src, dst)
+                return
+            except OSError:  # e.g. different file systems, fall back to copying
+                pass
+        shutil.copyfile(src, dst)
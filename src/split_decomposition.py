@@ -0,0 +1,97 @@
+from collections import deque
+from decimal import Decimal
+from typing import TYPE_CHECKING, Deque, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from .gnucash_file import Booking
+
+# A booking of `amount` on the first split's account against the second split's account:
+SplitPair = Tuple['Booking', 'Booking', Decimal]
+
+
+def decompose_splits(debit_splits: List['Booking'], credit_splits: List['Booking']) -> List[SplitPair]:
+    """
+    Decompose the splits of a transaction into pairs of splits and the amount booked between
+    them, since DATEV bookings always have exactly one account and one contra account.
+
+    If either side has a single split, each split of the other side is paired with it, for
+    its full amount. Otherwise (e.g. payroll or clearing transactions), both sides have to
+    balance exactly, and are matched in linear time:
+
+    1. Splits of equal amount on both sides are paired, in the order of the credit splits.
+    2. The remaining splits are paired greedily in their original order: each pair books the
+       smaller of the two remaining amounts, and the split that is used up is replaced by
+       the next one of its side.
+
+    This results in at most one booking less than there are remaining splits. A decomposition
+    into the fewest possible bookings would require solving subset sum problems.
+
+    :param debit_splits: The splits with a negative amount.
+    :param credit_splits: The splits with a positive amount.
+    :return: Tuples of a split, its contra split and the (positive) amount to book. The first
+        split is a credit split, unless there are several debit splits but only one credit split.
+    """
+
+    if not debit_splits or not credit_splits:
+        splits = debit_splits or credit_splits
+        description = f"\"{splits[0].description}\" ({splits[0].transaction_id})" if splits else "without any amounts"
+        raise ValueError(f"Transaction {description} has no {'credit' if debit_splits else 'debit'} splits, so it "
+                         f"cannot be converted into bookings. This might indicate that its splits are not "
+                         f"adjacent in the transactions export, see `group_memory_budget` (--unsorted-exports "
+                         f"on the command line).")
+
+    if len(debit_splits) > 1 and len(credit_splits) == 1:
+        return [(split, credit_splits[0], -split.amount_num) for split in debit_splits]
+    if len(debit_splits) == 1:
+        return [(split, debit_splits[0], split.amount_num) for split in credit_splits]
+
+    debit_total = -sum(split.amount_num for split in debit_splits)
+    credit_total = sum(split.amount_num for split in credit_splits)
+
+    if debit_total != credit_total:
+        raise ValueError(f"Transaction \"{credit_splits[0].description}\" ({credit_splits[0].transaction_id}) has "
+                         f"several debit and credit splits which don't balance (debit {debit_total}, credit "
+                         f"{credit_total}), so they cannot be decomposed into bookings.")
+
+    pairs: List[SplitPair] = []
+
+    # Pair splits of equal amounts:
+    debits_by_amount: Dict[Decimal, Deque[int]] = {}
+    for i, split in enumerate(debit_splits):
+        debits_by_amount.setdefault(-split.amount_num, deque()).append(i)
+
+    paired_debits = [False] * len(debit_splits)
+    remaining_credits = []
+
+    for split in credit_splits:
+        candidates = debits_by_amount.get(split.amount_num)
+        if candidates:
+            i = candidates.popleft()
+            paired_debits[i] = True
+            pairs.append((split, debit_splits[i], split.amount_num))
+        else:
+            remaining_credits.append(split)
+
+    remaining_debits = [split for split, paired in zip(debit_splits, paired_debits) if not paired]
+
+    # Pair the rest greedily; as both sides balance, they are used up at the same time:
+    d = c = 0
+    debit_left = -remaining_debits[0].amount_num if remaining_debits else Decimal(0)
+    credit_left = remaining_credits[0].amount_num if remaining_credits else Decimal(0)
+
+    while d < len(remaining_debits) and c < len(remaining_credits):
+        amount = min(debit_left, credit_left)
+        pairs.append((remaining_credits[c], remaining_debits[d], amount))
+        debit_left -= amount
+        credit_left -= amount
+
+        if not debit_left:
+            d += 1
+            if d < len(remaining_debits):
+                debit_left = -remaining_debits[d].amount_num
+        if not credit_left:
+            c += 1
+            if c < len(remaining_credits):
+                credit_left = remaining_credits[c].amount_num
+
+    return pairs
@@ -0,0 +1,85 @@
+import heapq
+import pickle
+import tempfile
+from itertools import groupby
+from typing import IO, TYPE_CHECKING, Dict, Iterable, Iterator, List
+
+if TYPE_CHECKING:
+    from .gnucash_file import Booking
+
+DEFAULT_MEMORY_BUDGET = 512 << 20  # 512 MiB
+
+SPLIT_SIZE_ESTIMATE = 640  # approximate memory used by one parsed split of an unsorted export, in bytes
+
+_RUN_BATCH_SIZE = 1024  # transactions per pickled batch in a run file
+
+
+def group_splits(splits: Iterable['Booking'], memory_budget: int = DEFAULT_MEMORY_BUDGET) -> Iterator[List['Booking']]:
+    """
+    Group splits by their transaction, regardless of the order they are given in, yielding the
+    splits of one transaction at a time.
+
+    Splits are grouped in memory as long as that fits into `memory_budget` bytes (estimated),
+    in which case transactions are yielded in the order of their first split. Beyond that, the
+    groups collected so far are sorted by date and transaction and written to a temporary file
+    ("run"), and all runs are merged afterwards; transactions are then yielded in date order.
+    """
+
+    max_splits = max(1, memory_budget // SPLIT_SIZE_ESTIMATE)
+    groups: Dict[str, List['Booking']] = {}
+    count = 0
+    runs: List[IO[bytes]] = []
+
+    try:
+        for split in splits:
+            group = groups.get(split.transaction_id)
+            if group is None:
+                groups[split.transaction_id] = [split]
+            else:
+                group.append(split)
+            count += 1
+
+            if count >= max_splits:
+                runs.append(_write_run(groups))
+                groups, count = {}, 0
+
+        if not runs:
+            yield from groups.values()
+            return
+
+        # The splits of a transaction might be spread over several runs; since the runs are sorted,
+        # they are adjacent after merging (in the order of the runs, i.e. in their original order):
+        last_run = sorted(groups.values(), key=_run_order)
+        merged = heapq.merge(*map(_read_run, runs), last_run, key=_run_order)
+
+        for _, parts in groupby(merged, key=lambda group: group[0].transaction_id):
+            yield [split for part in parts for split in part]
+    finally:
+        for f in runs:
+            f.close()
+
+
+def _run_order(group: List['Booking']):
+    return group[0].date, group[0].transaction_id
+
+
+def _write_run(groups: Dict[str, List['Booking']]) -> IO[bytes]:
+    f = tempfile.TemporaryFile(prefix='gnutev-run-')
+    pickler = pickle.Pickler(f, protocol=pickle.HIGHEST_PROTOCOL)
+    ordered = sorted(groups.values(), key=_run_order)
+
+    for i in range(0, len(ordered), _RUN_BATCH_SIZE):
+        pickler.dump(ordered[i:i + _RUN_BATCH_SIZE])
+        pickler.clear_memo()  # shared strings are stored once per batch, without keeping all objects alive
+
+    f.seek(0)
+    return f
+
+
+def _read_run(f: IO[bytes]) -> Iterator[List['Booking']]:
+    while True:
+        try:
+            batch = pickle.load(f)  # a new unpickler per batch, since the pickler's memo is cleared per batch
+        except EOFError:
+            return
+        yield from batch
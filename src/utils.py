@@ -1,6 +1,10 @@
 import datetime as dt
 import re
-from typing import Generator, Tuple, Any
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Generator, Tuple, Any, Iterable, Iterator, List, Callable, TypeVar
+
+T = TypeVar('T')
 
 AnyDateRepresentation = dt.date | str | int | float
 
@@ -9,24 +13,80 @@ def parse_any_date(x: str | float | int | dt.date) -> dt.date:
     if isinstance(x, dt.date):
         return x
     elif isinstance(x, str):
-        if '-' in x:  # prob. "2022-08-15"
-            y, m, d = x.split("-")
-            return dt.date(int(y), int(m), int(d))
-        elif m := re.match(r"(\d\d)/(\d\d)/(\d\d)", x):  # MM/DD/YY
-            return dt.date(2000 + int(m.group(3)), int(m.group(1)), int(m.group(2)))
-        elif m := re.match(r"(\d\d)/(\d\d)/(\d\d\d\d)", x):  # MM/DD/YYYY
-            return dt.date(int(m.group(3)), int(m.group(1)), int(m.group(2)))
-        elif m := re.match(r"(\d\d)\.(\d\d)\.(\d\d)", x):  # DD.MM.YY
-            return dt.date(2000 + int(m.group(3)), int(m.group(2)), int(m.group(1)))
-        elif m := re.match(r"(\d\d)\.(\d\d)\.(\d\d\d\d)", x):  # DD.MM.YYYY
-            return dt.date(int(m.group(3)), int(m.group(2)), int(m.group(1)))
-        elif x.isnumeric() and len(x) == 8:  # YYYYMMDD
-            return dt.date(int(x[:4]), int(x[4:6]), int(x[6:8]))
-        raise ValueError(f"Unknown date format: {x}")
+        return _default_date_parser.parse(x)
     elif isinstance(x, int) or isinstance(x, float):
         return dt.date.fromtimestamp(x)
 
 
+class DateParser:
+    """
+    Parses date strings (see `parse_any_date` for the supported formats), detecting the format
+    from the first value and using a specialised routine for it afterwards. Values not matching
+    the detected format cause a new detection, so mixing formats still works, just slower.
+
+    Use one instance per file or column, since these usually contain a single date format.
+    Parsed dates are memoized in a bounded cache, as dates tend to repeat a lot in exports.
+    """
+
+    def __init__(self, cache_size: int = 4096):
+        self._format: Callable[[str], dt.date | None] | None = None
+        self.parse: Callable[[str], dt.date] = lru_cache(maxsize=cache_size)(self._parse)
+
+    def _parse(self, x: str) -> dt.date:
+        if self._format is not None:
+            date = self._format(x)
+            if date is not None:
+                return date
+
+        for date_format in _DATE_FORMATS:
+            date = date_format(x)
+            if date is not None:
+                self._format = date_format
+                return date
+
+        raise ValueError(f"Unknown date format: {x}")
+
+
+def _parse_iso_date(x: str) -> dt.date | None:  # prob. "2022-08-15"
+    if '-' not in x:
+        return None
+    try:
+        return dt.date.fromisoformat(x)
+    except ValueError:
+        y, m, d = x.split("-")
+        return dt.date(int(y), int(m), int(d))
+
+
+def _regex_date_format(pattern: str, year: int, month: int, day: int, century: int = 0) -> Callable[[str], dt.date | None]:
+    regex = re.compile(pattern)
+
+    def parse(x: str) -> dt.date | None:
+        if m := regex.match(x):
+            return dt.date(century + int(m.group(year)), int(m.group(month)), int(m.group(day)))
+        return None
+
+    return parse
+
+
+def _parse_compact_date(x: str) -> dt.date | None:  # YYYYMMDD
+    if x.isnumeric() and len(x) == 8:
+        return dt.date(int(x[:4]), int(x[4:6]), int(x[6:8]))
+    return None
+
+
+# The `(?!\d)` ensures e.g. "MM/DD/YY" doesn't match the beginning of a "MM/DD/YYYY" date:
+_DATE_FORMATS = [
+    _parse_iso_date,
+    _regex_date_format(r"(\d\d)/(\d\d)/(\d\d)(?!\d)", year=3, month=1, day=2, century=2000),  # MM/DD/YY
+    _regex_date_format(r"(\d\d)/(\d\d)/(\d\d\d\d)(?!\d)", year=3, month=1, day=2),  # MM/DD/YYYY
+    _regex_date_format(r"(\d\d)\.(\d\d)\.(\d\d)(?!\d)", year=3, month=2, day=1, century=2000),  # DD.MM.YY
+    _regex_date_format(r"(\d\d)\.(\d\d)\.(\d\d\d\d)(?!\d)", year=3, month=2, day=1),  # DD.MM.YYYY
+    _parse_compact_date,
+]
+
+_default_date_parser = DateParser()
+
+
 def yearly_split(end_date: dt.date, start_date: dt.date) -> Generator[Tuple[dt.date, dt.date], None, None]:
     if not start_date < end_date:
         raise ValueError(f"Start date must be before end date: start={start_date.isoformat()} is not "
@@ -41,6 +101,54 @@ def yearly_split(end_date: dt.date, start_date: dt.date) -> Generator[Tuple[dt.d
     yield prev, end_date
 
 
+class Periods:
+    """
+    A sequence of consecutive, non-overlapping periods (e.g. as produced by `yearly_split`) that
+    dates can be mapped onto using a binary search over the period start dates.
+    """
+
+    def __init__(self, periods: Iterable[Tuple[dt.date, dt.date]]):
+        self.periods: List[Tuple[dt.date, dt.date]] = list(periods)
+        self._starts = [start for start, _ in self.periods]
+
+    def __len__(self) -> int:
+        return len(self.periods)
+
+    def __iter__(self) -> Iterator[Tuple[dt.date, dt.date]]:
+        return iter(self.periods)
+
+    def __getitem__(self, index: int) -> Tuple[dt.date, dt.date]:
+        return self.periods[index]
+
+    def index_of(self, date: dt.date) -> int | None:
+        """
+        Return the index of the period containing `date`, or None if it lies outside all periods.
+        """
+        i = bisect_right(self._starts, date) - 1
+        if i < 0 or date > self.periods[i][1]:
+            return None
+        return i
+
+    def partition(self, items: Iterable[T], key: Callable[[T], dt.date], sort: bool = True) -> List[List[T]]:
+        """
+        Bucket `items` into one list per period in a single pass, dropping items outside all periods.
+        If `sort` is True, each bucket is sorted by date (stable, so items of the same day keep their
+        order). Otherwise, the items keep their original order.
+        """
+        buckets = [[] for _ in self.periods]
+
+        for item in items:
+            i = self.index_of(key(item))
+            if i is not None:
+                buckets[i].append(item)
+
+        if sort:
+            for bucket in buckets:
+                bucket.sort(key=key)
+
+        return buckets
+
+
 def truncate_string(string: str, length: int, end='...') -> str:
     if len(string) <= length:
         return string